@@ -27,7 +27,8 @@ from botocore.config import Config  # type: ignore
 import boto3 # type: ignore
 from botocore.exceptions import ClientError, NoCredentialsError # type: ignore
 import logging
-from typing import Optional, List, Any
+from functools import lru_cache
+from typing import Optional, List, Any, Tuple
 from .util import UserReportError, check_aws_region_for_invalid_characters
 from .base import InstanceProperties, PositiveInteger, MemoryStr
 from .constants import ELB_DFLT_AWS_REGION, INPUT_ERROR, PERMISSIONS_ERROR
@@ -46,14 +47,22 @@ def create_aws_config(region: Optional[str] = None) -> Config:
 
 def get_regions(boto_cfg: Config = None) -> List[str]:
     """ Retrieves a list of available AWS region names """
-    ec2 = boto3.client('ec2') if boto_cfg == None else boto3.client('ec2', config=boto_cfg)
     try:
-        return [r['RegionName'] for r in ec2.describe_regions()['Regions']]
+        return list(_get_regions(boto_cfg.region_name if boto_cfg else None))
     except ClientError as err:
         logging.debug(err)
     return []
 
 
+@lru_cache(maxsize=None)
+def _get_regions(region: Optional[str]) -> Tuple[str, ...]:
+    """ Retrieves available AWS region names, results are cached per region
+    of the boto3 config. Raises botocore.exceptions.ClientError on failure,
+    which is not cached. """
+    ec2 = boto3.client('ec2') if region is None else boto3.client('ec2', config=create_aws_config(region))
+    return tuple(r['RegionName'] for r in ec2.describe_regions()['Regions'])
+
+
 def get_availability_zones_for(region: str) -> List[str]:
     """ Get a list of availability zones for the given region """
     check_aws_region_for_invalid_characters(region)
@@ -75,17 +84,25 @@ def get_machine_properties(instance_type: str, boto_cfg: Config = None) -> Insta
     """
     if instance_type.lower() == 'optimal':
         raise ValueError('optimal instance type is not supported in get_machine_properties')
-    ec2 = boto3.client('ec2') if boto_cfg == None else boto3.client('ec2', config=boto_cfg)
     try:
-        rv = ec2.describe_instance_types(InstanceTypes=[instance_type])
-        ncpus = int(rv['InstanceTypes'][0]['VCpuInfo']['DefaultVCpus'])
-        nram = int(rv['InstanceTypes'][0]['MemoryInfo']['SizeInMiB']) / 1024
+        return _get_machine_properties(instance_type, boto_cfg.region_name if boto_cfg else None)
     except ClientError as err:
         logging.debug(err)
         raise UserReportError(returncode=INPUT_ERROR, message=f'Invalid AWS machine type "{instance_type}"')
     except NoCredentialsError as err:
         logging.debug(err)
         raise UserReportError(returncode=PERMISSIONS_ERROR, message=str(err))
+
+
+@lru_cache(maxsize=None)
+def _get_machine_properties(instance_type: str, region: Optional[str]) -> InstanceProperties:
+    """ Get the number of vCPUs and memory in GB for a given instance type,
+    results are cached per instance type and region of the boto3 config.
+    Exceptions raised by boto3 are not cached. """
+    ec2 = boto3.client('ec2') if region is None else boto3.client('ec2', config=create_aws_config(region))
+    rv = ec2.describe_instance_types(InstanceTypes=[instance_type])
+    ncpus = int(rv['InstanceTypes'][0]['VCpuInfo']['DefaultVCpus'])
+    nram = int(rv['InstanceTypes'][0]['MemoryInfo']['SizeInMiB']) / 1024
     return InstanceProperties(ncpus, nram)
 
 
@@ -29,7 +29,11 @@ import configparser
 import re
 from dataclasses import dataclass, field, Field, fields, _MISSING_TYPE
 from enum import Enum, auto
-from typing import Dict, List, Union, Optional, NamedTuple
+from typing import Any, ClassVar, Dict, List, Union, Optional, NamedTuple, Tuple, FrozenSet
+
+# memory amount: a number followed by a unit, for example 100m or 1.5Gi
+re_memory_str = re.compile(r'^\d+[kKmMgGtT]i?$|^\d+.\d+[kKmMgGtT]i?$')
+
 
 @dataclass(frozen=True)
 class InstanceProperties:
@@ -61,41 +65,43 @@ class PositiveInteger(int):
     def __new__(cls, value):
         """Constructor, validates that argumant is a positive integer after
         conversion to int"""
+        msg = 'Must be a positive integer.'
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(msg)
         try:
-            if isinstance(value, float) and value != round(value):
-                raise ValueError
             int_value = int(value)
-            if int_value <= 0:
-                raise ValueError()
-        except ValueError as err:
-            msg = 'Must be a positive integer.'
+        except ValueError:
             raise ValueError(msg)
-        return super(cls, cls).__new__(cls, value)
+        if int_value <= 0:
+            raise ValueError(msg)
+        return super(cls, cls).__new__(cls, int_value)
 
 
 class Percentage(int):
     """A subclass of int that accepts only percentages: an integer between 0
     and 100"""
     def __new__(cls, value):
+        msg = 'Percentage must be a positive integer between 0 and 100'
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(msg)
         try:
-            if isinstance(value, float) and value != round(value):
-                raise ValueError
             int_value = int(value)
-            if int_value < 0 or int_value > 100:
-                raise ValueError
         except ValueError:
-            msg = 'Percentage must be a positive integer between 0 and 100'
             raise ValueError(msg)
-        return super(cls, cls).__new__(cls, value)
+        if int_value < 0 or int_value > 100:
+            raise ValueError(msg)
+        return super(cls, cls).__new__(cls, int_value)
 
 
 class BoolFromStr:
     """A class that converts strings to boolean values.
     False is created if string value is one of: n, no, 0, false, or empty
     string. True is created otherwise. String values are not case sensitive."""
+    FALSE_STRINGS = frozenset(['n', 'no', '0', 'false', ''])
+
     def __new__(cls, value):
         if isinstance(value, str):
-            return not value.lower() in ['n', 'no', '0', 'false', '']
+            return value.lower() not in cls.FALSE_STRINGS
         return bool(value)
 
 
@@ -106,8 +112,7 @@ class MemoryStr(str):
     def __new__(cls, value):
         """Constructor, validates that argumant is a valid GCP name"""
         str_value = str(value)
-        number_re = re.compile(r'^\d+[kKmMgGtT]i?$|^\d+.\d+[kKmMgGtT]i?$')
-        if not number_re.match(str_value):
+        if not re_memory_str.match(str_value):
             raise ValueError('Memory request or limit must be specified by a number followed by a unit, for example 100m')
         unit_pos = -1
         if str_value.endswith('i'):
@@ -183,12 +188,53 @@ class ConfigParserToDataclassMapper:
     """
     
     mapping: Dict[str, Optional[ParamInfo]] = field(init=False)
+    # set for each subclass in __init_subclass__
+    _mapping_missing: ClassVar[bool]
+    _fields_cache: ClassVar[Dict[str, Any]]
 
     def __init__(self):
         """Contructor needed so that dataclass does not auto generate one"""
         pass
 
 
+    def __init_subclass__(cls, **kwargs):
+        """Record whether a subclass defines the mapping attribute, so that
+        a missing mapping is detected without failed attribute lookups, and
+        create the subclass cache of dataclass field information"""
+        super().__init_subclass__(**kwargs)
+        cls._mapping_missing = not hasattr(cls, 'mapping')
+        # dataclass fields are not known until the dataclass decorator
+        # processes the subclass, so the cache is filled on first use
+        cls._fields_cache = {}
+
+
+    @classmethod
+    def _fields(cls) -> Tuple[Field, ...]:
+        """Return dataclass fields, computed once per class"""
+        cache = cls._fields_cache
+        if 'fields' not in cache:
+            cache['fields'] = fields(cls)
+            cache['names'] = frozenset(field.name for field in cache['fields'])
+            cache['types'] = {field.name: cls.get_non_union_type(field)
+                              for field in cache['fields']}
+        return cache['fields']
+
+
+    @classmethod
+    def _field_names(cls) -> FrozenSet[str]:
+        """Return names of dataclass fields, computed once per class"""
+        cls._fields()
+        return cls._fields_cache['names']
+
+
+    @classmethod
+    def _field_type(cls, field: Field):
+        """Return the result of get_non_union_type for a dataclass field of
+        this class, computed once per class"""
+        cls._fields()
+        return cls._fields_cache['types'][field.name]
+
+
     @classmethod
     def create_from_cfg(cls, parser, **kwargs):
         """Meant to be used by a subclass. Create a subclass object
@@ -203,29 +249,20 @@ class ConfigParserToDataclassMapper:
             ValueError: if a required parameter is missing in ConfigParser or
             ValueError is raised during subclass attribute initialization
         """
-        # check that all dataclass attributes are mapped to configparser params
-        cls.validate_mapping()
         errors = []
-        for field in fields(cls):
+        for field, mapped in cls._mapped_fields():
             if field.init:
-                mapped = cls.mapping[field.name]
                 # ignore dataclass attributes mapped to None
                 if mapped is None:
                     continue
-                # skip dataclass attributes that with default values and no
-                # parameter values in ConfigParser object
-                # field.default == dataclass._MISSING_TYPE means that the
-                # dataclass attribute has no default value
-                if not isinstance(field.default, _MISSING_TYPE) and \
-                       (mapped.section not in parser or \
-                        mapped.param_name not in parser[mapped.section]):
-                    continue
-
-                # report a required parameter missing in ConfigParser
-                if isinstance(field.default, _MISSING_TYPE) and \
-                       (mapped.section not in parser or \
-                        mapped.param_name not in parser[mapped.section]):
-                    errors.append(f'Missing {mapped.param_name}')
+                if not parser.has_option(mapped.section, mapped.param_name):
+                    # report a required parameter missing in ConfigParser,
+                    # field.default == dataclass._MISSING_TYPE means that the
+                    # dataclass attribute has no default value
+                    if isinstance(field.default, _MISSING_TYPE):
+                        errors.append(f'Missing {mapped.param_name}')
+                    # skip dataclass attributes with default values and no
+                    # parameter values in ConfigParser object
                     continue
 
                 # initialize dataclass attribute value, call the appropriate
@@ -250,11 +287,31 @@ class ConfigParserToDataclassMapper:
         return obj
 
     
+    @classmethod
+    def _mapped_fields(cls) -> Tuple[Tuple[Field, Optional[ParamInfo]], ...]:
+        """Return dataclass fields, except for mapping, paired with the
+        ConfigParser parameters they map to. The mapping is validated and the
+        result computed once per class.
+
+        Raises AttributeError if an attribute is not in mapping."""
+        cache = cls._fields_cache
+        if 'mapped' not in cache:
+            # check that all dataclass attributes are mapped to configparser
+            # params
+            cls.validate_mapping()
+            cache['mapped'] = tuple((field, cls.mapping[field.name])
+                                    for field in cls._fields()
+                                    if field.name != 'mapping')
+        return cache['mapped']
+
+
     @classmethod
     def validate_mapping(cls):
         """Verify that all class attributes appear in the mapping dictionary.
         Raises AttributeError if an attribute is not in mapping."""
-        for field in fields(cls):
+        if getattr(cls, '_mapping_missing', True):
+            raise AttributeError(f'Class {cls.__name__} does not define mapping to ConfigParser params')
+        for field in cls._fields():
             if field.name not in cls.mapping and field.name != 'mapping':
                 raise AttributeError(f'Field {field.name} does not have mapping to ConfigParser params')
 
@@ -268,18 +325,16 @@ class ConfigParserToDataclassMapper:
             parser: ConfigParser object
             errors: A list where error messages will be appended
         """
-        self.validate_mapping()
-        for field in fields(self):
+        for field, mapped in self._mapped_fields():
             # skip attrubutes initialized via class constructor and those that
             # map to None
-            if field.name == 'mapping' or field.init or self.mapping[field.name] is None:
-                continue
-            mapped = self.mapping[field.name]
-            if mapped is None:
+            if field.init or mapped is None:
                 continue
-            if mapped.section in parser and mapped.param_name in parser[mapped.section]:
+            if parser.has_option(mapped.section, mapped.param_name):
                 param = self.initialize_value(field, mapped, parser, errors)
-                self.__setattr__(field.name, param)
+                # field names are known to be valid, skip the check in
+                # __setattr__
+                object.__setattr__(self, field.name, param)
 
 
     @classmethod
@@ -292,16 +347,12 @@ class ConfigParserToDataclassMapper:
             parser: ConfigParser object
             errors: A list where error messages will be appended
         """
-        cls.validate_mapping()
-        for field in fields(cls):
+        for field, mapped in cls._mapped_fields():
             # skip attrubutes initialized via class constructor and those that
             # map to None
-            if field.name == 'mapping' or field.init or cls.mapping[field.name] is None:
-                continue
-            mapped = cls.mapping[field.name]
-            if mapped is None:
+            if field.init or mapped is None:
                 continue
-            if mapped.section in parser and mapped.param_name in parser[mapped.section]:
+            if parser.has_option(mapped.section, mapped.param_name):
                 cls.initialize_value(field, mapped, parser, errors)
 
 
@@ -339,19 +390,20 @@ class ConfigParserToDataclassMapper:
         # Union types cannot be initialized, types like Optional[int] are
         # really Union[int, None]. If the attribute type is a Union,
         # initialize the first type that is not None.
-        ftype = cls.get_non_union_type(field)
+        ftype = cls._field_type(field)
 
         # if attribute type is an enum, initialize it from str
         if issubclass(ftype, Enum):
+            param_value = parser[mapped.section][mapped.param_name]
             try:
                 # first try the string as is
-                value = ftype[parser[mapped.section][mapped.param_name]]
+                value = ftype[param_value]
             except KeyError:
                 # then try uppercase
                 try:
-                    value = ftype[parser[mapped.section][mapped.param_name].upper()]
+                    value = ftype[param_value.upper()]
                 except KeyError:
-                    errors.append(f'Parameter "{mapped.param_name}" has invalid value: "{parser[mapped.section][mapped.param_name]}", should be one of {", ".join([i.name for i in ftype])}')
+                    errors.append(f'Parameter "{mapped.param_name}" has invalid value: "{param_value}", should be one of {", ".join([i.name for i in ftype])}')
                     # in case of an error initialize the attribute to any value
                     # so that something can be returned and problems with
                     # more parameters can be reported from a single run
@@ -364,11 +416,12 @@ class ConfigParserToDataclassMapper:
         # otherwise call attribute's class constructor with ConfigParser
         # parameter value
         else:
+            param_value = parser[mapped.section][mapped.param_name]
             try:
-                value = ftype(parser[mapped.section][mapped.param_name])
+                value = ftype(param_value)
             except ValueError as err:
-                errors.append(f'Parameter "{mapped.param_name}" has an invalid value: "{parser[mapped.section][mapped.param_name]}": {str(err)}')
-                if '$' in parser[mapped.section][mapped.param_name]:
+                errors.append(f'Parameter "{mapped.param_name}" has an invalid value: "{param_value}": {str(err)}')
+                if '$' in param_value:
                     errors.append('The character $ is not allowed, as ElasticBLAST configuration files do not support variable substitution.')
                 value = None
         return value
@@ -378,7 +431,7 @@ class ConfigParserToDataclassMapper:
         """Reinitialize all dataclass attributes to have them in the appropriate
         type. Useful if an object was initialized with values of only basic types,
         for example in deserializaton."""
-        for field in fields(self):
+        for field in self._fields():
             if field.name == 'mapping':
                 continue
             # If this function is called from self.__post_init__, not all
@@ -389,9 +442,9 @@ class ConfigParserToDataclassMapper:
                 continue
             if value is None:
                 continue
-            ftype = self.get_non_union_type(field)
+            ftype = self._field_type(field)
             if ftype != type(self.__getattribute__(field.name)):
-                self.__setattr__(field.name, ftype(value))
+                object.__setattr__(self, field.name, ftype(value))
 
 
     # FIXME: this function does not really belong in this class and should
@@ -400,7 +453,7 @@ class ConfigParserToDataclassMapper:
         """Prevent creation of new attributes to catch misspelled class
         attribute values. Raises AttributeError if a value is being assigned to
         a new class attribute."""
-        if name not in [i.name for i in fields(self)]:
+        if name not in self._field_names():
             raise AttributeError(f'Attribute {name} does not exist in class {type(self)}')
         super().__setattr__(name, value)
 
@@ -408,7 +461,7 @@ class ConfigParserToDataclassMapper:
     def __getattr__(self, name):
         """Return None for uninitialized dataclass attributes.
         Raises AttrubuteError for other non-existant class attributes"""
-        if name in [i.name for i in fields(self)]:
+        if name in self._field_names():
             return None
         else:
             raise AttributeError(f'"{type(self).__name__}" has no attribute "{name}"')
@@ -188,6 +188,8 @@ def report_config_error(msg: List[str]) -> None:
     raise UserReportError(returncode=INPUT_ERROR, message=err_msg)
 
 
+re_s3_bucket_name = re.compile(r'^[a-z0-9][a-zA-Z0-9._-]{1,61}[a-z0-9]$|^arn:(aws).*:s3:[a-z-0-9]+:[0-9]{12}:accesspoint[/:][a-zA-Z0-9-]{1,63}$|^arn:(aws).*:s3-outposts:[a-z-0-9]+:[0-9]{12}:outpost[/:][a-zA-Z0-9-]{1,63}[/:]accesspoint[/:][a-zA-Z0-9-]{1,63}$')
+re_gs_bucket_name = re.compile(r'^[a-z0-9][a-z0-9._-]+[a-z0-9]$')
 def validate_cloud_storage_object_uri(uri: str) -> None:
     """Validate cloud storage object uri for GS and S3.
     Only bucket name is checked, because object key can be almost anything."""
@@ -199,14 +201,14 @@ def validate_cloud_storage_object_uri(uri: str) -> None:
         # 3 and 63 characters long;
         # https://docs.aws.amazon.com/AmazonS3/latest/dev/BucketRestrictions.html
         # bucket name can also be provided as ARN
-        if re.fullmatch(r'^[a-z0-9][a-zA-Z0-9._-]{1,61}[a-z0-9]$|^arn:(aws).*:s3:[a-z-0-9]+:[0-9]{12}:accesspoint[/:][a-zA-Z0-9-]{1,63}$|^arn:(aws).*:s3-outposts:[a-z-0-9]+:[0-9]{12}:outpost[/:][a-zA-Z0-9-]{1,63}[/:]accesspoint[/:][a-zA-Z0-9-]{1,63}$', bucket) is None:
+        if re_s3_bucket_name.fullmatch(bucket) is None:
             raise ValueError('An S3 bucket name must contain only lowercase letters, numbers, dashes (-), and dots (.), must begin and end with a letter or a number, and must be between 3 and 63 characters long.')
     # separate test for object key
     elif uri.startswith(ELB_GCS_PREFIX):
         # GS bucket name must contain only lowercase letters, numbers, dashes,
         # and underscores, and start and end with a letter or a number
         # https://cloud.google.com/storage/docs/naming-buckets
-        if re.fullmatch(r'^[a-z0-9][a-z0-9._-]+[a-z0-9]$', bucket) is None:
+        if re_gs_bucket_name.fullmatch(bucket) is None:
             raise ValueError('A GS bucket name must contain only lowercase letters, numbers, dashes (-), underscores (_), and dots (.)')
     else:
         raise ValueError(f'An object URI must start with {ELB_GCS_PREFIX} or {ELB_S3_PREFIX}')
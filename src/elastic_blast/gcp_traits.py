@@ -25,6 +25,7 @@ Author: Victor Joukov joukovv@ncbi.nlm.nih.gov
 """
 
 import re, logging
+from functools import lru_cache
 from .base import InstanceProperties
 from .util import safe_exec
 from .constants import GCP_APIS
@@ -48,6 +49,7 @@ GCP_MACHINES = {
     "c2-standard" : 4,
 }
 re_gcp_machine_type = re.compile(r'([^-]+-[^-]+)-([0-9]+)')
+@lru_cache(maxsize=None)
 def get_machine_properties(machineType: str) -> InstanceProperties:
     """ given the CGP machine type returns tuple of number of CPUs and abount of RAM in GB """
     ncpu = 0
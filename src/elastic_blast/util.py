@@ -470,23 +470,25 @@ def validate_gcp_disk_name(val: str) -> None:
         raise ValueError(f'"{val}" is not a valid GCE disk name. The string must be less than 61 characters long and can only contain lowercase letters, digits, and dashes.')
 
 
+re_gcp_string = re.compile(r'^[a-z0-9_\-]+$')
 def validate_gcp_string(val: str) -> None:
     """Test whether a given string is a legal GCP id: containes only lowercase
     letters, digits, underscores, and dashes.
 
     Raises:
         ValueError if the string is not a legal GCP id"""
-    if re.match(r'^[a-z0-9_\-]+$', val) is None:
+    if re_gcp_string.match(val) is None:
         raise ValueError(f'"{val}" is not a legal GCP id. The string can only contain lowercase letters, digits, underscores, and dashes.')
 
 
+re_aws_region = re.compile(r'^[A-Za-z0-9\-]+$')
 def check_aws_region_for_invalid_characters(val: str) -> None:
     """Test whether a given string is an acceptable AWS region name:
     alphanumeric characters, plus dashes.
 
     Raises:
         ValueError if the string is not a legal AWS region name"""
-    if re.match(r'^[A-Za-z0-9\-]+$', val) is None:
+    if re_aws_region.match(val) is None:
         raise ValueError(f'{val} is not a legal AWS region name. The string can only contain letters, numbers, and dashes.')
 
 
@@ -561,6 +561,7 @@ def test_blastdb_error(app_mocks):
 
 
 # This test requires running elastic-blast in subprocess and cannot be mocked
+@pytest.mark.serial
 @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='This test is flaky in TC')
 def test_interrupt_error():
     p = subprocess.Popen([ELB_EXENAME, 'submit',
@@ -0,0 +1,36 @@
+#                           PUBLIC DOMAIN NOTICE
+#              National Center for Biotechnology Information
+#  
+# This software is a "United States Government Work" under the
+# terms of the United States Copyright Act.  It was written as part of
+# the authors' official duties as United States Government employees and
+# thus cannot be copyrighted.  This software is freely available
+# to the public for use.  The National Library of Medicine and the U.S.
+# Government have not placed any restriction on its use or reproduction.
+#   
+# Although all reasonable efforts have been taken to ensure the accuracy
+# and reliability of the software and data, the NLM and the U.S.
+# Government do not and cannot warrant the performance or results that
+# may be obtained by using this software or data.  The NLM and the U.S.
+# Government disclaim all warranties, express or implied, including
+# warranties of performance, merchantability or fitness for any particular
+# purpose.
+#   
+# Please cite NCBI in any work or product based on this material.
+
+
+"""
+tests/aws/conftest.py - pytest configuration for AWS tests
+
+"""
+
+import os
+from elastic_blast.constants import ELB_DFLT_AWS_REGION
+from tests.utils import clear_aws_traits_cache
+
+
+def pytest_configure(config):
+    """Set default AWS region once for all tests, before test collection.
+    Credentials are not set here, because tests that access real AWS services
+    need them, and moto mocks set fake credentials while they are active."""
+    os.environ.setdefault('AWS_DEFAULT_REGION', ELB_DFLT_AWS_REGION)
@@ -28,8 +28,12 @@ Unit tests for aws module
 # this call for each AWS API accessed in the test. If you get authorization
 # error, you very likely forgot to call this.
 
-# To make things easier, the cloudformation, iam, ec2, batch, and s3 fixtures
-# do the above for you.
+# To make things easier, the aws_env fixture does the above for EC2, IAM, AWS
+# Batch, and S3, and the cloudformation fixture for CloudFormation. The
+# cloudformation, iam, ec2, batch, and s3 fixtures provide boto3 objects for
+# these services. The fixtures are module-scoped, mocked AWS resources are
+# removed after each test by the reset_moto fixture. Tests that access real
+# AWS services belong in test_aws_cloud.py.
 
 # To make things even easier, if you need elastic_blast.aws.ElasticBlastAws object with
 # default parameters, use ElasticBlastAws fixture (see
@@ -42,12 +46,12 @@ Unit tests for aws module
 # imported inside test function.
 
 import configparser
+import contextlib
+import copy
 import os
 import json
-import re
 import boto3 #type: ignore
 import getpass
-from moto import mock_batch, mock_s3, mock_ec2, mock_cloudformation, mock_iam #type: ignore
 
 from elastic_blast import aws
 from elastic_blast import aws_traits
@@ -58,8 +62,7 @@ from elastic_blast.util import UserReportError
 from elastic_blast.filehelper import parse_bucket_name_key
 from elastic_blast.base import InstanceProperties, DBSource
 from elastic_blast.elb_config import ElasticBlastConfig, PositiveInteger
-from elastic_blast.db_metadata import DbMetadata
-from tests.utils import aws_credentials, gke_mock, MockedStsClient, GKEMock
+from tests.utils import gke_mock, MockedStsClient, GKEMock, db_metadata
 
 from botocore.exceptions import ClientError #type: ignore
 from unittest.mock import call, patch, MagicMock
@@ -67,42 +70,103 @@ import pytest
 
 
 TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'config', 'data')
-TEST_CONFIG_DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 
+DB_METADATA = db_metadata()
 
-@pytest.fixture
-def ec2(aws_credentials):
+
+# tests affected by a moto bug are skipped unconditionally
+skip_moto_cfn_bug = pytest.mark.skip(reason='There seems to be a bug in moto library handling CloudFormation conditions')
+
+# moto mocks started by the aws_env fixture
+_MOTO_MOCKS = []
+
+
+@pytest.fixture(scope='module')
+def aws_env():
+    """Start moto mocks for EC2, IAM, AWS Batch, and S3"""
+    # moto is imported only when a mocked AWS service is needed. The simple
+    # AWS Batch backend does not run jobs in docker containers, which these
+    # tests do not need.
+    from moto import mock_batch_simple, mock_ec2, mock_iam, mock_s3 #type: ignore
+    with contextlib.ExitStack() as stack:
+        for mock in [mock_ec2(), mock_iam(), mock_batch_simple(), mock_s3()]:
+            _MOTO_MOCKS.append(stack.enter_context(mock))
+        yield
+        _MOTO_MOCKS.clear()
+
+
+@pytest.fixture(scope='module')
+def ec2(aws_env):
     """Get mocked API for EC2"""
-    with mock_ec2():
-        yield boto3.resource('ec2')
+    return boto3.resource('ec2', region_name=ELB_DFLT_AWS_REGION)
 
 
-@pytest.fixture()
-def iam(aws_credentials):
+@pytest.fixture(scope='module')
+def iam(aws_env):
     """Get mocked API for AWS IAM"""
-    with mock_iam():
-        yield boto3.resource('iam')
+    return boto3.resource('iam', region_name=ELB_DFLT_AWS_REGION)
 
 
-@pytest.fixture()
-def cloudformation(aws_credentials):
-    """Get mocked API for AWS cloudformation"""
-    with mock_cloudformation():
-        yield boto3.resource('cloudformation')
+@pytest.fixture(scope='module')
+def cloudformation(aws_env):
+    """Get mocked API for AWS cloudformation. It is not a part of aws_env,
+    because moto CloudFormation mock requires extra dependencies and most
+    tests mock CloudFormation themselves."""
+    from moto import mock_cloudformation #type: ignore
+    with mock_cloudformation() as mock:
+        _MOTO_MOCKS.append(mock)
+        yield boto3.resource('cloudformation', region_name=ELB_DFLT_AWS_REGION)
+        _MOTO_MOCKS.remove(mock)
 
 
-@pytest.fixture()
-def batch(aws_credentials):
+@pytest.fixture(scope='module')
+def batch(aws_env):
     """Get mocked API for AWS Batch"""
-    with mock_batch():
-        yield boto3.client('batch')
+    return boto3.client('batch', region_name=ELB_DFLT_AWS_REGION)
 
 
-@pytest.fixture()
-def s3(aws_credentials):
+@pytest.fixture(scope='module')
+def s3(aws_env):
     """Get mocked API for S3"""
-    with mock_s3():
-        yield boto3.resource('s3')
+    return boto3.resource('s3', region_name=ELB_DFLT_AWS_REGION)
+
+
+@pytest.fixture(autouse=True)
+def reset_moto():
+    """Remove mocked AWS resources created by a test, so that tests sharing
+    module-scoped moto mocks stay independent"""
+    yield
+    for mock in _MOTO_MOCKS:
+        for backend in mock.backends.values():
+            backend.reset()
+
+
+# trust policies for roles created by create_roles
+BATCH_TRUST_POLICY = json.dumps(
+    {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {"Service": "batch.amazonaws.com"},
+                "Action": "sts:AssumeRole",
+            }
+        ],
+    }
+)
+
+EC2_TRUST_POLICY = json.dumps(
+    {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {"Service": "ec2.amazonaws.com"},
+                "Action": "sts:AssumeRole",
+            }
+        ],
+    }
+)
 
 
 def create_roles():
@@ -117,35 +181,11 @@ def create_roles():
     # setting), so the roles do not require policies.
     service_role = iam.create_role(
         RoleName="BatchServiceRole",
-        AssumeRolePolicyDocument=json.dumps(
-            {
-                "Version": "2012-10-17",
-                "Statement": [
-                    {
-                        "Effect": "Allow",
-                        "Principal": {"Service": "batch.amazonaws.com"},
-                        "Action": "sts:AssumeRole",
-                    }
-                ],
-            }
-        ),
-    )
+        AssumeRolePolicyDocument=BATCH_TRUST_POLICY)
 
     instance_role = iam.create_role(
         RoleName="InstanceRole",
-        AssumeRolePolicyDocument=json.dumps(
-            {
-                "Version": "2012-10-17",
-                "Statement": [
-                    {
-                        "Effect": "Allow",
-                        "Principal": {"Service": "ec2.amazonaws.com"},
-                        "Action": "sts:AssumeRole",
-                    }
-                ],
-            }
-        ),
-    )
+        AssumeRolePolicyDocument=EC2_TRUST_POLICY)
 
     instance_profile = iam.create_instance_profile(
         InstanceProfileName="InstanceProfile")
@@ -171,6 +211,26 @@ def initialize_cfg() -> ElasticBlastConfig:
     return cfg
 
 
+@pytest.fixture(scope='module')
+def base_cfg():
+    """Minimal config for an AWS search created once per module, with cloud
+    calls made during config validation mocked. Tests should use the cfg
+    fixture, which provides a copy that can be modified."""
+    with patch(target='elastic_blast.elb_config.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 128))), \
+         patch(target='elastic_blast.elb_config.get_db_metadata', new=MagicMock(return_value=DB_METADATA)), \
+         patch(target='elastic_blast.tuner.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 128))), \
+         patch(target='elastic_blast.tuner.aws_get_machine_type', new=MagicMock(return_value='test-machine-type')), \
+         patch(target='boto3.client', new=MagicMock(side_effect=GKEMock().mocked_client)):
+        cfg = initialize_cfg()
+    return cfg
+
+
+@pytest.fixture
+def cfg(base_cfg):
+    """A copy of minimal config for an AWS search"""
+    return copy.deepcopy(base_cfg)
+
+
 def create_ElasticBlastAws(cfg: ElasticBlastConfig):
     """Create elastic_blast.aws.ElasticBlastAws object with default parameters unless set
     otherwise.
@@ -190,10 +250,9 @@ def create_ElasticBlastAws(cfg: ElasticBlastConfig):
 
 
 @pytest.fixture
-def ElasticBlastAws(cloudformation, iam, ec2, batch):
+def ElasticBlastAws(cloudformation, cfg):
     """Fixture that creates elastic_blast.aws.ElasticBlastAws object with default
     parameters"""
-    cfg = initialize_cfg()
     yield create_ElasticBlastAws(cfg)
 
 
@@ -208,13 +267,12 @@ def check_ElasticBlastAws_object(eb, cfg):
     batch_client = boto3.client('batch')
 
     # check that Cloudformation Stack was created
-    assert len(list(eb.cf.stacks.all()))
+    assert next(iter(eb.cf.stacks.all()), None) is not None
     assert eb.cf_stack.stack_status == 'CREATE_COMPLETE'
 
-    # get job queue name from job queu ARN
-    m = re.match(r'^arn.*job-queue/(.*)$', eb.job_queue_name)
-    assert m
-    queue_name = m.group(1)
+    # get job queue name from job queue ARN
+    arn_prefix, sep, queue_name = eb.job_queue_name.rpartition('job-queue/')
+    assert arn_prefix.startswith('arn') and sep
 
     # test AWS Batch Job Queue
     queues = batch_client.describe_job_queues(jobQueues=[])['jobQueues']
@@ -253,8 +311,8 @@ def check_ElasticBlastAws_object(eb, cfg):
     # FIXME: moto cloudformation does not create launch template
 
 
-@pytest.mark.skipif(True, reason='There seems to be a bug in moto library handling CloudFormation conditions')
-def test_ElasticBlastAws_init_custom_vpc(cloudformation, ec2, iam, batch):
+@skip_moto_cfn_bug
+def test_ElasticBlastAws_init_custom_vpc(cloudformation, ec2, iam, batch, cfg):
     """Test initialization of elastic_blast.aws.ElasticBlastAws with AWS resource
     creation and user-provided VPC"""
 
@@ -266,14 +324,13 @@ def test_ElasticBlastAws_init_custom_vpc(cloudformation, ec2, iam, batch):
         Description="Test security group", GroupName="sg1", VpcId=vpc.id)
 
     # set subnet and security group in elastic-blast config
-    cfg = initialize_cfg()
     cfg.aws.subnet = subnet.id
     cfg.aws.security_group = security_group.id
     eb = create_ElasticBlastAws(cfg)
     check_ElasticBlastAws_object(eb, cfg)
 
 
-@pytest.mark.skipif(True, reason='There seems to be a bug in moto library handling CloudFormation conditions')
+@skip_moto_cfn_bug
 def test_ElasticBlastAws_init_auto_vpc(ElasticBlastAws, batch):
     """Test initialization of elastic_blast.aws.ElasticBlastAws with AWS resource
     creation and auto-created VPC"""
@@ -281,7 +338,24 @@ def test_ElasticBlastAws_init_auto_vpc(ElasticBlastAws, batch):
     check_ElasticBlastAws_object(eb, eb.cfg)
 
 
-@pytest.mark.skipif(True, reason='There seems to be a bug in moto library handling CloudFormation conditions')
+def s3_object_exists(bucket, key):
+    """Check whether an object exists in an S3 bucket without listing the
+    bucket
+
+    Arguments:
+        bucket: boto3 S3 Bucket object
+        key: Object key
+    """
+    try:
+        bucket.meta.client.head_object(Bucket=bucket.name, Key=key)
+    except ClientError as err:
+        if err.response['Error']['Code'] == '404':
+            return False
+        raise
+    return True
+
+
+@skip_moto_cfn_bug
 def test_ElasticBlastAws_delete(ElasticBlastAws, s3, mocker):
     """Test elastic_blast.ElasticBlastAws.delete function"""
 
@@ -297,14 +371,14 @@ def test_ElasticBlastAws_delete(ElasticBlastAws, s3, mocker):
                       Key=query_batch)
 
     # test that a query batch exists in the mocked S3 bucket
-    assert query_batch in [s.key for s in list(bucket.objects.all())]
+    assert s3_object_exists(bucket, query_batch)
 
     # put a fake results file in the S3 bucket
     results_key = 'batch-blastn-000.out.gz'
     bucket.put_object(ACL='public-read',
                       Body=b'Some content',
                       Key=results_key)
-    assert results_key in [s.key for s in list(bucket.objects.all())]
+    assert s3_object_exists(bucket, results_key)
 
     # the mock library has holes, so we need to mock eb.cf and eb.cf_stack
     # objects ourselves
@@ -318,8 +392,8 @@ def test_ElasticBlastAws_delete(ElasticBlastAws, s3, mocker):
     assert mocked_stack.method_calls == [call.delete()]
 
     # test that query batch was deleted and results were not
-    assert query_batch not in [s.key for s in list(bucket.objects.all())]
-    assert results_key in [s.key for s in list(bucket.objects.all())]
+    assert not s3_object_exists(bucket, query_batch)
+    assert s3_object_exists(bucket, results_key)
 
 
 def test_create_config_from_file(gke_mock, mocker):
@@ -338,39 +412,6 @@ def test_create_config_from_file(gke_mock, mocker):
     assert cfg.cluster.db_source == DBSource.AWS
 
 
-@pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
-def test_provide_vpc_dry_run():
-    cfg = ElasticBlastConfig(aws_region='us-east-2',
-                             program='blastn',
-                             db='pdbnt',
-                             results='s3://elasticblast-test',
-                             queries='queries',
-                             task = ElbCommand.SUBMIT)
-                             
-
-    cfg.cluster.dry_run = True
-    cfg.cluster.pd_size = '1G'
-    cfg.cluster.name = 'example'
-    cfg.cluster.disk_type = 'gp2'
-    cfg.cluster.iops = 2000
-    cfg.cluster.machine_type = 't2.nano'
-    cfg.cluster.num_nodes = 1
-    
-    # us-east-2 has default vpc, should provide it
-    cfg.aws.region = 'us-east-2'
-    cfg.aws.security_group = 'sg-test'
-    
-    b = aws.ElasticBlastAws(cfg)
-    b.delete()
-
-    # us-east-1 doesn't, should create new one
-    cfg.aws.region = 'us-east-1'
-    cfg.aws.security_group = 'sg-test'
-
-    b = aws.ElasticBlastAws(cfg)
-    b.delete()
-
-
 class MockedCloudformationStackEvent:
     """Mocked cloudformation stack envnt"""
 
@@ -394,6 +435,7 @@ class MockedCloudformationStackEventList:
 
 class MockedCloudformationStack:
     """Mocked cloudformation stack, base class"""
+    __slots__ = ('events',)
 
     def __init__(self):
         self.events = MockedCloudformationStackEventList(list())
@@ -403,12 +445,14 @@ class MockedCloudformationStackNotCreated(MockedCloudformationStack):
     """Mocked cloudformation stack object that simulates a stack that was not
     created. Raises botocore.exceptons.ClientError when one tries to access
     any object attribute."""
-    # __setattr__ is called on every atttribute binding, not only assignment
 
-    def __setattr__(self, name, value):
-        """Override set object attribute function"""
-        # needs to be imported here, to avoid conflicts with moto
-        from botocore.exceptions import ClientError
+    def __init__(self):
+        """No attributes are set, so that __getattr__ is called for all of
+        them"""
+        pass
+
+    def __getattr__(self, name):
+        """Called when an object attribute is not found"""
         # from https://stackoverflow.com/questions/37143597/mocking-boto3-s3-client-method-python
         parsed_response = {
             'Error': {'Code': '500', 'Message': 'Error Uploading'}}
@@ -418,6 +462,7 @@ class MockedCloudformationStackNotCreated(MockedCloudformationStack):
 class MockedCloudformationStackWithCreateErrors(MockedCloudformationStack):
     """Mocked cloudformation stack object that simulates a stack with
     CREATE_FAILED status and errors in stack events."""
+    __slots__ = ('stack_status',)
 
     def __init__(self):
         event_no_errors = MockedCloudformationStackEvent()
@@ -431,6 +476,7 @@ class MockedCloudformationStackWithDeleteErrors(MockedCloudformationStack):
     """Mocked cloudformation stack object that simulates a stack with
     DELETE_FAILED status and errors in stack events a delete function that
     does nothing."""
+    __slots__ = ('stack_status',)
 
     def __init__(self):
         event_no_errors = MockedCloudformationStackEvent()
@@ -483,35 +529,28 @@ class MockedCloudformation:
     def Stack(self, name):
         """Create a stack object for an AWS cloudformation stack that does
         not exist."""
-        return MockedCloudformationStackNotCreated()
+        return NOT_CREATED_STACK
 
     def create_stack(self, **kwargs):
         """Create a new stack that fails to create and has errors"""
-        return MockedCloudformationStackWithCreateErrors()
+        return CREATE_ERRORS_STACK
 
     def get_waiter(self, status):
         """Return a mocked waiter object"""
         return MockedWaiter()
 
 
-DB_METADATA = DbMetadata(version = '1',
-                         dbname = 'some-name',
-                         dbtype = 'Protein',
-                         description = 'A test database',
-                         number_of_letters = 25,
-                         number_of_sequences = 25,
-                         files = [],
-                         last_updated = 'some-date',
-                         bytes_total = 25,
-                         bytes_to_cache = 25,
-                         number_of_volumes = 1)
+# stack objects are not modified by tested code, so they can be shared
+NOT_CREATED_STACK = MockedCloudformationStackNotCreated()
+CREATE_ERRORS_STACK = MockedCloudformationStackWithCreateErrors()
+
 
 @patch(target='elastic_blast.elb_config.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 128)))
 @patch(target='elastic_blast.elb_config.get_db_metadata', new=MagicMock(return_value=DB_METADATA))
 @patch(target='elastic_blast.tuner.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 128)))
 @patch(target='elastic_blast.aws.get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 128)))
 @patch(target='elastic_blast.tuner.aws_get_machine_type', new=MagicMock(return_value='test-machine-type'))
-def test_report_cloudformation_create_errors(batch, s3, iam, ec2, mocker):
+def test_report_cloudformation_create_errors(batch, s3, iam, ec2, cfg):
     """Test proper reporting of cloudformation stack creation errors"""
 
     from elastic_blast.aws import ElasticBlastAws
@@ -539,19 +578,19 @@ def test_report_cloudformation_create_errors(batch, s3, iam, ec2, mocker):
             return batch
         return GKEMock().mocked_client(name, config)
 
-    mocker.patch('boto3.resource', side_effect=mocked_resource)
-    mocker.patch('boto3.client', side_effect=mocked_client)
-
-    cfg = initialize_cfg()
-    with pytest.raises(UserReportError) as err:
-        elb = ElasticBlastAws(cfg, create=True)
+    # boto3 is mocked only while the tested code runs, so that pytest
+    # fixtures and other test code use the regular moto objects
+    with patch('boto3.resource', side_effect=mocked_resource), \
+         patch('boto3.client', side_effect=mocked_client):
+        with pytest.raises(UserReportError) as err:
+            elb = ElasticBlastAws(cfg, create=True)
 
     assert err.value.returncode == DEPENDENCY_ERROR
     assert 'CloudFormation stack creation failed' in err.value.message
     assert 'Expected error message'
 
 
-@pytest.mark.skipif(True, reason='There seems to be a bug in moto library handling CloudFormation conditions')
+@skip_moto_cfn_bug
 def test_report_cloudformation_delete_errors(ElasticBlastAws, mocker):
     """Test proper reporting of cloudformation stack deletion errors"""
     eb = ElasticBlastAws
@@ -577,31 +616,3 @@ def test_report_cloudformation_delete_errors(ElasticBlastAws, mocker):
     assert err.value.returncode == DEPENDENCY_ERROR
     assert 'Cloudformation stack deletion failed' in err.value.message
     assert 'Expected error message'
-
-
-@pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
-def test_incorrect_user_db():
-    cfg = configparser.ConfigParser()
-    cfg.read(f"{TEST_CONFIG_DATA_DIR}/aws-wrong-custom-db.ini")
-    cfg = ElasticBlastConfig(cfg, task = ElbCommand.SUBMIT)
-    cfg.cluster.machine_type = 't2.micro'
-    try:
-        with pytest.raises(UserReportError) as exc_info:
-            b = aws.ElasticBlastAws(cfg, create=True)
-    finally:
-        # In case the test fails and cluster is created, clean up the cluster
-        b = aws.ElasticBlastAws(cfg)
-        b.delete()
-    assert(exc_info.value.returncode == BLASTDB_ERROR)
-    assert('is not a valid BLAST database' in exc_info.value.message)
-
-
-@pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
-def test_wrong_provider_user_db():
-    cfg = configparser.ConfigParser()
-    cfg.read(f"{TEST_CONFIG_DATA_DIR}/aws-wrong-provider-custom-db.ini")
-    with pytest.raises(UserReportError) as exc_info:
-        cfg = ElasticBlastConfig(cfg, task = ElbCommand.SUBMIT)
-    assert(exc_info.value.returncode == BLASTDB_ERROR)
-    assert('User database ' in exc_info.value.message)
-    assert('must reside in AWS S3' in exc_info.value.message)
@@ -0,0 +1,105 @@
+#                           PUBLIC DOMAIN NOTICE
+#              National Center for Biotechnology Information
+#  
+# This software is a "United States Government Work" under the
+# terms of the United States Copyright Act.  It was written as part of
+# the authors' official duties as United States Government employees and
+# thus cannot be copyrighted.  This software is freely available
+# to the public for use.  The National Library of Medicine and the U.S.
+# Government have not placed any restriction on its use or reproduction.
+#   
+# Although all reasonable efforts have been taken to ensure the accuracy
+# and reliability of the software and data, the NLM and the U.S.
+# Government do not and cannot warrant the performance or results that
+# may be obtained by using this software or data.  The NLM and the U.S.
+# Government disclaim all warranties, express or implied, including
+# warranties of performance, merchantability or fitness for any particular
+# purpose.
+#   
+# Please cite NCBI in any work or product based on this material.
+
+
+"""
+Unit tests for aws module that access real AWS services. These are kept
+separate from test_aws.py, because the moto mocks there are module-scoped and
+would intercept calls made by these tests.
+
+"""
+
+import configparser
+import os
+import pytest
+
+from elastic_blast import aws
+from elastic_blast.constants import BLASTDB_ERROR, ElbCommand
+from elastic_blast.elb_config import ElasticBlastConfig
+from elastic_blast.util import UserReportError
+
+
+TEST_CONFIG_DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+pytestmark = pytest.mark.serial
+
+
+@pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
+def test_provide_vpc_dry_run():
+    cfg = ElasticBlastConfig(aws_region='us-east-2',
+                             program='blastn',
+                             db='pdbnt',
+                             results='s3://elasticblast-test',
+                             queries='queries',
+                             task = ElbCommand.SUBMIT)
+                             
+
+    cfg.cluster.dry_run = True
+    cfg.cluster.pd_size = '1G'
+    cfg.cluster.name = 'example'
+    cfg.cluster.disk_type = 'gp2'
+    cfg.cluster.iops = 2000
+    cfg.cluster.machine_type = 't2.nano'
+    cfg.cluster.num_nodes = 1
+    
+    # us-east-2 has default vpc, should provide it
+    cfg.aws.region = 'us-east-2'
+    cfg.aws.security_group = 'sg-test'
+    
+    b = aws.ElasticBlastAws(cfg)
+    b.delete()
+
+    # us-east-1 doesn't, should create new one
+    cfg.aws.region = 'us-east-1'
+    cfg.aws.security_group = 'sg-test'
+
+    b = aws.ElasticBlastAws(cfg)
+    b.delete()
+
+
+@pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
+def test_incorrect_user_db():
+    cfg = configparser.ConfigParser()
+    cfg.read(f"{TEST_CONFIG_DATA_DIR}/aws-wrong-custom-db.ini")
+    cfg = ElasticBlastConfig(cfg, task = ElbCommand.SUBMIT)
+    cfg.cluster.machine_type = 't2.micro'
+    b = None
+    try:
+        with pytest.raises(UserReportError) as exc_info:
+            b = aws.ElasticBlastAws(cfg, create=True)
+    finally:
+        # In case the test fails and cluster is created, clean up the cluster.
+        # A new handle is needed only if cluster creation raised an exception.
+        if b is None:
+            b = aws.ElasticBlastAws(cfg)
+        b.delete()
+    assert(exc_info.value.returncode == BLASTDB_ERROR)
+    assert('is not a valid BLAST database' in exc_info.value.message)
+
+
+@pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
+def test_wrong_provider_user_db():
+    cfg = configparser.ConfigParser()
+    cfg.read(f"{TEST_CONFIG_DATA_DIR}/aws-wrong-provider-custom-db.ini")
+    with pytest.raises(UserReportError) as exc_info:
+        cfg = ElasticBlastConfig(cfg, task = ElbCommand.SUBMIT)
+    assert(exc_info.value.returncode == BLASTDB_ERROR)
+    assert('User database ' in exc_info.value.message)
+    assert('must reside in AWS S3' in exc_info.value.message)
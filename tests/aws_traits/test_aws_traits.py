@@ -24,13 +24,17 @@ Test for elastic_blast.aws_traits
 Author: Greg Boratyn boratyng@ncbi.nlm.nih.gov
 """
 import os
+import json
+from unittest.mock import MagicMock
 from elastic_blast.aws_traits import get_machine_properties, create_aws_config, get_availability_zones_for
-from elastic_blast.aws_traits import get_regions
+from elastic_blast.aws_traits import get_regions, get_instance_type_offerings
 from elastic_blast.base import InstanceProperties
 from elastic_blast.util import UserReportError
 from elastic_blast.constants import INPUT_ERROR, ELB_DFLT_AWS_REGION
 import pytest
 
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
 
 def test_create_config():
     """Test boto3 config creation"""
@@ -46,6 +50,7 @@ def test_create_default_config():
     assert config.region_name == ELB_DFLT_AWS_REGION
 
 
+@pytest.mark.serial
 @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
 def test_get_regions():
     regions = get_regions()
@@ -57,6 +62,7 @@ def test_get_regions():
     assert 'dummy' not in regions
 
 
+@pytest.mark.serial
 @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
 def test_machine_properties():
     props = get_machine_properties('m4.10xlarge')
@@ -71,31 +77,52 @@ def test_machine_properties_optimal():
         props = get_machine_properties('optimal')
     assert 'optimal instance type is not supported' in str(err)
 
+@pytest.mark.serial
 @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
-def test_get_azs_us_east_1():
-    azs = get_availability_zones_for('us-east-1')
-    assert 6 == len(azs)
-
-
-@pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
-def test_get_azs_us_east_2():
-    azs = get_availability_zones_for('us-east-2')
-    assert 3 == len(azs)
-
-
-@pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
-def test_get_azs_us_west_1():
-    azs = get_availability_zones_for('us-west-1')
-    assert 2 == len(azs)
-
-
-@pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
-def test_get_azs_us_west_2():
-    azs = get_availability_zones_for('us-west-2')
-    assert 4 == len(azs)
+@pytest.mark.parametrize('region, expected_num_azs', [('us-east-1', 6),
+                                                      ('us-east-2', 3),
+                                                      ('us-west-1', 2),
+                                                      ('us-west-2', 4)])
+def test_get_azs(region, expected_num_azs):
+    azs = get_availability_zones_for(region)
+    assert expected_num_azs == len(azs)
 
 
+@pytest.mark.serial
 @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
 def test_get_azs_invalid_region():
     with pytest.raises(ValueError) as err:
         azs = get_availability_zones_for('this-region-does-not-exist!')
+
+
+def test_machine_properties_cached(mocker):
+    """Test that instance type properties are retrieved from AWS once"""
+    ec2 = MagicMock()
+    ec2.describe_instance_types.return_value = {'InstanceTypes': [{'VCpuInfo': {'DefaultVCpus': 32},
+                                                                   'MemoryInfo': {'SizeInMiB': 131072}}]}
+    mocker.patch('boto3.client', return_value=ec2)
+    for _ in range(2):
+        assert get_machine_properties('m5.8xlarge', create_aws_config()) == InstanceProperties(ncpus=32, memory=128)
+    ec2.describe_instance_types.assert_called_once_with(InstanceTypes=['m5.8xlarge'])
+
+
+def test_get_instance_type_offerings(mocker):
+    """Test listing instance types offered in a region with a recorded
+    describe_instance_type_offerings response"""
+    with open(os.path.join(TEST_DATA_DIR, 'us-east-1-offerings.json')) as f:
+        response = json.load(f)
+    ec2 = MagicMock()
+    ec2.describe_instance_type_offerings.return_value = response
+    mocker.patch('boto3.client', return_value=ec2)
+    offerings = get_instance_type_offerings('us-east-1')
+    assert len(offerings) == len(response['InstanceTypeOfferings'])
+    assert 'm5.8xlarge' in offerings
+    ec2.describe_instance_type_offerings.assert_called_once()
+
+
+@pytest.mark.serial
+@pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
+def test_get_instance_type_offerings_real():
+    """Test listing instance types offered in a region with a real AWS call"""
+    offerings = get_instance_type_offerings('us-east-1')
+    assert 'm5.8xlarge' in offerings
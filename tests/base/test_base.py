@@ -32,59 +32,79 @@ from elastic_blast.base import PositiveInteger, Percentage, BoolFromStr, MemoryS
 import pytest
 
 
-def test_positive_integer():
-    """Test PositiveInteger type validation"""
-    assert issubclass(type(PositiveInteger(1)), int)
-    for val in [1, 2, 5, 100, 2.0, '1', '2', '25']:
-        assert PositiveInteger(val) == int(val)
-    
-    for val in [0, -2, 1.5, '0', '-2', '0.1']:
-        with pytest.raises(ValueError):
-            PositiveInteger(val)
-        
-
-def test_positive_percentage():
-    """Test Percentage type validation"""
-    assert issubclass(type(Percentage(1)), int)
-    for val in [0, 1, 2, 5, 100, 2.0, '1', '2', '25']:
-        assert Percentage(val) == int(val)
-    
-    for val in [-2, 1.5, '-2', '0.1']:
-        with pytest.raises(ValueError):
-            PositiveInteger(val)
+@pytest.fixture(scope='session')
+def empty_cfg():
+    """An empty ConfigParser object shared by tests that do not modify it"""
+    return configparser.ConfigParser()
+
+
+@pytest.mark.parametrize('val', [1, 2, 5, 100, 2.0, '1', '2', '25'])
+def test_positive_integer(val):
+    """Test PositiveInteger type validation for valid values"""
+    assert isinstance(PositiveInteger(val), int)
+    assert PositiveInteger(val) == int(val)
+
+
+@pytest.mark.parametrize('val', [0, -2, 1.5, '0', '-2', '0.1'])
+def test_positive_integer_invalid(val):
+    """Test PositiveInteger type validation for invalid values"""
+    with pytest.raises(ValueError):
+        PositiveInteger(val)
+
+
+@pytest.mark.parametrize('val', [0, 1, 2, 5, 100, 2.0, '1', '2', '25'])
+def test_positive_percentage(val):
+    """Test Percentage type validation for valid values"""
+    assert isinstance(Percentage(val), int)
+    assert Percentage(val) == int(val)
+
 
+@pytest.mark.parametrize('val', [-2, 1.5, '-2', '0.1', 101, '101'])
+def test_positive_percentage_invalid(val):
+    """Test Percentage type validation for invalid values"""
+    with pytest.raises(ValueError):
+        Percentage(val)
 
-def test_boolfromstr():
-    """Test BoolFromStr type"""
-    assert BoolFromStr(True)
-    assert not BoolFromStr(False)
-    for val in ['n', 'N', 'NO', 'No', '0', 'false', 'False', 'FALSE']:
-        assert not BoolFromStr(val)
 
-    for val in ['y', 'Y', 'YES', 'Yes', '1', 'true', 'True', 'TRUE']:
-        assert BoolFromStr(val)
-        
+@pytest.mark.parametrize('val', [False, 'n', 'N', 'NO', 'No', '0', 'false', 'False', 'FALSE'])
+def test_boolfromstr_false(val):
+    """Test BoolFromStr type for values converted to False"""
+    assert not BoolFromStr(val)
 
-def test_memorystr():
-    """Test MemoryStr type validation"""
-    for val in ['123G', '123g', '123M', '123m', '123.5m', '25k', '25K']:
+
+@pytest.mark.parametrize('val', [True, 'y', 'Y', 'YES', 'Yes', '1', 'true', 'True', 'TRUE'])
+def test_boolfromstr_true(val):
+    """Test BoolFromStr type for values converted to True"""
+    assert BoolFromStr(val)
+
+
+@pytest.mark.parametrize('val', ['123G', '123g', '123M', '123m', '123.5m', '25k', '25K'])
+def test_memorystr(val):
+    """Test MemoryStr type validation for valid values"""
+    MemoryStr(val)
+
+
+@pytest.mark.parametrize('val', [123, '123', '123mm', '123a', 'G'])
+def test_memorystr_invalid(val):
+    """Test MemoryStr type validation for invalid values"""
+    with pytest.raises(ValueError):
         MemoryStr(val)
 
-    for val in [123, '123', '123mm', '123a', 'G']:
-        print(val)
-        with pytest.raises(ValueError):
-            MemoryStr(val)
 
+def test_memorystr_conversion():
+    """Test MemoryStr conversion to different units"""
     assert MemoryStr('1024mi').asGiB() == 1.0
     assert MemoryStr('3G').asGB() == 3.0
     assert MemoryStr('1G').asMB() == 1000.0
     assert MemoryStr('1Gi').asMB() == 1074.0
     assert MemoryStr('1Gi').asGB() == 1.074
-    
+
 
 def test_configparsertodataclassmapper():
     """Test basic functionality of ConfigParserToDataclassMapper base class"""
     class SomeType:
+        __slots__ = ('value',)
+
         def __init__(self, value):
             self.value = int(value) + 1
 
@@ -150,7 +170,7 @@ def test_bool_param_from_str():
     assert conf.param_2 == False
 
 
-def test_configparsertodataclassmapper_missing_mapping():
+def test_configparsertodataclassmapper_missing_mapping(empty_cfg):
     """Test that instantiaing a  subclass without mapping attribute raises
     AttributeError"""
     @dataclass
@@ -158,7 +178,7 @@ def test_configparsertodataclassmapper_missing_mapping():
         pass
 
     with pytest.raises(AttributeError):
-        TestEmpty.create_from_cfg(configparser.ConfigParser())
+        TestEmpty.create_from_cfg(empty_cfg)
 
 
     @dataclass
@@ -166,7 +186,7 @@ def test_configparsertodataclassmapper_missing_mapping():
         attribute: int = 5
 
     with pytest.raises(AttributeError):
-        TestMissing.create_from_cfg(configparser.ConfigParser())
+        TestMissing.create_from_cfg(empty_cfg)
 
 
 def test_configparsertodataclassmapper_report_missing_param():
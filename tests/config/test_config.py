@@ -25,8 +25,6 @@ Author: Christiam Camacho (camacho@ncbi.nlm.nih.gov)
 Created: Fri 24 Apr 2020 09:43:24 AM EDT
 """
 import os
-import sys
-import unittest
 from unittest.mock import MagicMock, patch
 import pytest
 import configparser
@@ -34,6 +32,7 @@ import argparse
 import hashlib
 import getpass
 import re
+from functools import lru_cache
 from elastic_blast.util import UserReportError
 
 from elastic_blast.config import configure, _set_sections
@@ -55,176 +54,202 @@ from elastic_blast.util import ElbSupportedPrograms
 from elastic_blast.gcp_traits import get_machine_properties
 from elastic_blast.base import InstanceProperties, DBSource
 from elastic_blast.elb_config import ElasticBlastConfig
-from elastic_blast.db_metadata import DbMetadata
-from tests.utils import gke_mock, GKEMock, mocked_safe_exec
+from tests.utils import gke_mock, GKEMock, mocked_safe_exec, db_metadata
 
 TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 
-DB_METADATA = DbMetadata(version = '1',
-                         dbname = 'some-name',
-                         dbtype = 'Protein',
-                         description = 'A test database',
-                         number_of_letters = int(25e9),
-                         number_of_sequences = 25,
-                         files = [],
-                         last_updated = 'some-date',
-                         bytes_total = 25,
-                         bytes_to_cache = 25,
-                         number_of_volumes = 1)
+# BLAST options must be separated by whitespace in merged options string
+re_outfmt_11 = re.compile(r'(^| )-outfmt 11($| )')
+re_outfmt_8 = re.compile(r'(^| )-outfmt 8($| )')
+re_task_blastp_fast = re.compile(r'(^| )-task blastp-fast($| )')
+re_mem_limit_exceeds = re.compile(r'Memory limit.*exceeds')
+
+# ElbSupportedPrograms is stateless and can be shared by all tests
+SUPPORTED_PROGRAMS = ElbSupportedPrograms()
+
+DB_METADATA = db_metadata(number_of_letters = int(25e9))
+
+
+INVALID_GCP_CLUSTER_NAMES = [
+    'invalid-CLUSTER_NAME',
+    'invalid-cluster-name-',
+    'invalid-cluster-name-because-it-is-long-it-should-be-less-than-40-characters',
+    'elasticblast-gvn_pasquini-41f2c8234'
+]
+
+
+@pytest.fixture
+def aws_machine_properties():
+    """Report the same properties for every AWS instance type"""
+    props = MagicMock(return_value=InstanceProperties(32, 120))
+    with patch(target='elastic_blast.elb_config.aws_get_machine_properties', new=props), \
+         patch(target='elastic_blast.tuner.aws_get_machine_properties', new=props):
+        yield props
+
+
+@lru_cache(maxsize=None)
+def _load_ini_dict(path):
+    """Parse an INI file once, with the same parser settings as
+    config.configure, and return its content as a dictionary of sections.
+    Values are not interpolated, parsers that the dictionary is read into do
+    it. The result is shared between tests and must not be modified."""
+    cp = configparser.ConfigParser(empty_lines_in_values=False)
+    with open(path) as f:
+        cp.read_file(f)
+    return {section: dict(cp.items(section, raw=True)) for section in cp.sections()}
+
+
+def _clone_cfg(cfg_dict):
+    """Create a new ConfigParser from a dictionary of sections, such as the
+    one returned by _load_ini_dict"""
+    cfg = configparser.ConfigParser()
+    cfg.read_dict(cfg_dict)
+    return cfg
+
+
+def _make_cfg(ini_name, overrides = None):
+    """Create a ConfigParser with top level sections, content of a test INI
+    file from the cache, and optional parameter values
+    overrides: {section: {parameter: value}}"""
+    cfg = configparser.ConfigParser()
+    _set_sections(cfg)
+    cfg.read_dict(_load_ini_dict(os.path.join(TEST_DATA_DIR, ini_name)))
+    if overrides:
+        cfg.read_dict(overrides)
+    return cfg
+
+
+# Explicitly set incorrect and correct values for single parameters:
+# (section, parameter, invalid value, valid value)
+INVALID_PARAM_VALUES = [
+    (CFG_BLAST, CFG_BLAST_BATCH_LEN, 'junk', '1'),
+    (CFG_BLAST, CFG_BLAST_MEM_REQUEST, 'junk', '1G'),
+    (CFG_BLAST, CFG_BLAST_MEM_LIMIT, 'junk', '1.0G'),
+    (CFG_TIMEOUTS, CFG_TIMEOUT_INIT_PV, 'junk', '1'),
+    (CFG_TIMEOUTS, CFG_TIMEOUT_BLAST_K8S_JOB, '-3', '1'),
+    (CFG_BLAST, CFG_BLAST_DB_SRC, 'none', 'ncbi')
+]
+
+
+@pytest.fixture(scope='module')
+def invalid_params_fixed():
+    """Content of invalid-parameters.ini with the invalid values corrected"""
+    cfg = _make_cfg('invalid-parameters.ini',
+                    {CFG_BLAST: {CFG_BLAST_PROGRAM: 'blastp', CFG_BLAST_DB_SRC: 'AWS'},
+                     CFG_CLUSTER: {CFG_CLUSTER_NUM_NODES: '1'}})
+    return {section: dict(cfg[section]) for section in cfg.sections()}
 
 
 @patch(target='elastic_blast.elb_config.get_db_metadata', new=MagicMock(return_value=DB_METADATA))
 @patch(target='elastic_blast.elb_config.safe_exec', new=MagicMock(side_effect=mocked_safe_exec))
 @patch(target='elastic_blast.util.safe_exec', new=MagicMock(side_effect=mocked_safe_exec))
 @patch(target='elastic_blast.gcp_traits.safe_exec', new=MagicMock(side_effect=mocked_safe_exec))
-class ElbConfigLibTester(unittest.TestCase):
+class TestElbConfigLib:
 
     """ Testing class for this module. """
 
     def test_invalid_configuration_blank(self):
         cfg = configparser.ConfigParser()
 
-        with self.assertRaises(UserReportError):
+        with pytest.raises(UserReportError):
             ElasticBlastConfig(cfg, task=ElbCommand.SUBMIT)
 
         _set_sections(cfg)
-        with self.assertRaises(UserReportError):
+        with pytest.raises(UserReportError):
             ElasticBlastConfig(cfg, task=ElbCommand.SUBMIT)
 
 
-    def setUp(self):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
         self.cfg = configparser.ConfigParser()
         _set_sections(self.cfg)
 
-    def test_invalid_gcp_cluster_name(self):
-        self.cfg.read(f"{TEST_DATA_DIR}/correct-cfg-file.ini")
-        cfg = ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-
-        self.cfg[CFG_CLUSTER][CFG_CLUSTER_NAME] = 'invalid-CLUSTER_NAME'
-        with self.assertRaises(UserReportError):
-            ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT).validate()
-
-        self.cfg[CFG_CLUSTER][CFG_CLUSTER_NAME] = 'invalid-cluster-name-'
-        with self.assertRaises(UserReportError):
-            ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT).validate()
-
-        self.cfg[CFG_CLUSTER][CFG_CLUSTER_NAME] = 'invalid-cluster-name-because-it-is-long-it-should-be-less-than-40-characters'
-        with self.assertRaises(UserReportError):
-            ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT).validate()
-
-        self.cfg[CFG_CLUSTER][CFG_CLUSTER_NAME] = 'elasticblast-gvn_pasquini-41f2c8234'
-        with self.assertRaises(UserReportError):
+    @pytest.mark.parametrize('name', INVALID_GCP_CLUSTER_NAMES)
+    def test_invalid_gcp_cluster_name(self, name):
+        self.cfg = _make_cfg('correct-cfg-file.ini', {CFG_CLUSTER: {CFG_CLUSTER_NAME: name}})
+        with pytest.raises(UserReportError):
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT).validate()
 
+    def test_valid_gcp_cluster_name(self):
+        self.cfg = _make_cfg('correct-cfg-file.ini')
+        ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
         self.cfg[CFG_CLUSTER][CFG_CLUSTER_NAME] = 'valid-name'
         ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT).validate()
 
     def test_invalid_configuration_invalid_params(self):
-        self.cfg.read(f"{TEST_DATA_DIR}/invalid-parameters.ini")
+        self.cfg = _make_cfg('invalid-parameters.ini')
 
-        with self.assertRaises(UserReportError):
+        with pytest.raises(UserReportError):
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
 
         self.cfg[CFG_BLAST][CFG_BLAST_PROGRAM] = 'blastp'
-        with self.assertRaises(UserReportError):
+        with pytest.raises(UserReportError):
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
 
         self.cfg[CFG_CLUSTER][CFG_CLUSTER_NUM_NODES] = '1'
 
         self.cfg[CFG_BLAST][CFG_BLAST_DB_SRC] = 'AWS'
-        self.cfg.write(sys.stdout)
         ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
 
+    @pytest.mark.parametrize('section, param, invalid, valid', INVALID_PARAM_VALUES,
+                             ids=[f'{i[0]}.{i[1]}' for i in INVALID_PARAM_VALUES])
+    def test_invalid_param_value(self, invalid_params_fixed, section, param, invalid, valid):
+        """Test that an invalid parameter value is reported and a valid one accepted"""
+        cfg = _clone_cfg(invalid_params_fixed)
 
-        # Test some explicitly set incorrect values: blast.batch-len
-        self.cfg[CFG_BLAST][CFG_BLAST_BATCH_LEN] = 'junk'
-        with self.assertRaises(UserReportError):
-            ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-        self.cfg[CFG_BLAST][CFG_BLAST_BATCH_LEN] = '1'
-        ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-
-        # Test some explicitly set incorrect values: blast.mem-request
-        self.cfg[CFG_BLAST][CFG_BLAST_MEM_REQUEST] = 'junk'
-        with self.assertRaises(UserReportError):
-            ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-        self.cfg[CFG_BLAST][CFG_BLAST_MEM_REQUEST] = '1G'
-        ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-
-        # Test some explicitly set incorrect values: blast.mem-limit
-        self.cfg[CFG_BLAST][CFG_BLAST_MEM_LIMIT] = 'junk'
-        with self.assertRaises(UserReportError):
-            ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-        self.cfg[CFG_BLAST][CFG_BLAST_MEM_LIMIT] = '1.0G'
-        ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-
-        # Test some explicitly set incorrect values: timeouts.init-pv
-        self.cfg[CFG_TIMEOUTS][CFG_TIMEOUT_INIT_PV] = 'junk'
-        with self.assertRaises(UserReportError):
-            ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-        self.cfg[CFG_TIMEOUTS][CFG_TIMEOUT_INIT_PV] = '1'
-        ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-
-        # Test some explicitly set incorrect values: timeouts.blast-k8s-job
-        self.cfg[CFG_TIMEOUTS][CFG_TIMEOUT_BLAST_K8S_JOB] = '-3'
-        with self.assertRaises(UserReportError):
-            ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-        self.cfg[CFG_TIMEOUTS][CFG_TIMEOUT_BLAST_K8S_JOB] = '1'
-        ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-
-        # Test some explicitly set incorrect values: blast.blastdb-src
-        self.cfg[CFG_BLAST][CFG_BLAST_DB_SRC] = 'none'
-        with self.assertRaises(UserReportError):
-            ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-        self.cfg[CFG_BLAST][CFG_BLAST_DB_SRC] = 'ncbi'
-        ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
+        cfg[section][param] = invalid
+        with pytest.raises(UserReportError):
+            ElasticBlastConfig(cfg, task = ElbCommand.SUBMIT)
+        cfg[section][param] = valid
+        ElasticBlastConfig(cfg, task = ElbCommand.SUBMIT)
 
     def test_invalid_configuration_corrupt_file(self):
-        with self.assertRaises(configparser.MissingSectionHeaderError):
+        with pytest.raises(configparser.MissingSectionHeaderError):
             self.cfg.read(f"{TEST_DATA_DIR}/corrupt-cfg-file.ini")
 
     def test_invalid_configuration_non_existent_file(self):
-        with self.assertRaises(FileNotFoundError):
+        with pytest.raises(FileNotFoundError):
             args = argparse.Namespace(cfg='/dev/null')
             cfg = configure(args)
 
-        with self.assertRaises(FileNotFoundError):
+        with pytest.raises(FileNotFoundError):
             args = argparse.Namespace(cfg='some-non-existent-file')
             cfg = configure(args)
 
     def test_invalid_configuration_missing_required_params(self):
-        self.cfg.read(f"{TEST_DATA_DIR}/missing-required-parameters.ini")
-        with self.assertRaises(UserReportError):
+        self.cfg = _make_cfg('missing-required-parameters.ini')
+        with pytest.raises(UserReportError):
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
         self.cfg[CFG_BLAST][CFG_BLAST_RESULTS] = "my-bucket"
-        with self.assertRaises(UserReportError):
+        with pytest.raises(UserReportError):
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
         self.cfg[CFG_BLAST][CFG_BLAST_RESULTS] = "gs://my-bucket"
-        with self.assertRaises(UserReportError):
+        with pytest.raises(UserReportError):
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
         self.cfg[CFG_BLAST][CFG_BLAST_DB] = "nr"
-        with self.assertRaises(UserReportError):
+        with pytest.raises(UserReportError):
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
         self.cfg[CFG_CLOUD_PROVIDER][CFG_CP_GCP_PROJECT] = "dummy"
         self.cfg[CFG_BLAST][CFG_BLAST_DB_SRC] = "GCP"
         ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
 
     def test_invalid_gcp_network_configuration(self):
-        self.cfg.read(f"{TEST_DATA_DIR}/incomplete-gcp-vpc-cfg-file.ini")
-        with self.assertRaises(UserReportError):
+        self.cfg = _make_cfg('incomplete-gcp-vpc-cfg-file.ini')
+        with pytest.raises(UserReportError):
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
         self.cfg[CFG_CLOUD_PROVIDER][CFG_CP_GCP_NETWORK] = "custom-vpc"
         ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
 
-    @patch(target='elastic_blast.elb_config.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
+    @pytest.mark.usefixtures('aws_machine_properties')
     def test_provisioned_iops(self):
         with patch('boto3.client', side_effect=GKEMock().mocked_client):
-            self.cfg.read(f"{TEST_DATA_DIR}/elb-aws-blastn-pdbnt.ini")
+            self.cfg = _make_cfg('elb-aws-blastn-pdbnt.ini')
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
             self.cfg[CFG_CLUSTER][CFG_CLUSTER_PROVISIONED_IOPS] = '2000'
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
 
     def test_correct_configuration(self):
-        self.cfg.read(f"{TEST_DATA_DIR}/correct-cfg-file.ini")
+        self.cfg = _make_cfg('correct-cfg-file.ini')
         ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
 
     def test_minimal_configuration(self):
@@ -233,30 +258,28 @@ class ElbConfigLibTester(unittest.TestCase):
         self.cfg = configure(args)
         cfg = ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
 
-        self.assertTrue(cfg.cluster.db_source)
-        self.assertEqual(cfg.cluster.db_source, DBSource.GCP)
+        assert cfg.cluster.db_source
+        assert cfg.cluster.db_source == DBSource.GCP
 
-        self.assertTrue(cfg.blast.batch_len)
-        self.assertEqual(cfg.blast.batch_len, 20000)
+        assert cfg.blast.batch_len
+        assert cfg.blast.batch_len == 20000
 
-        self.assertTrue(cfg.cluster.mem_request)
-        self.assertEqual(cfg.cluster.mem_request, '0.5G')
+        assert cfg.cluster.mem_request
+        assert cfg.cluster.mem_request == '0.5G'
 
-        self.assertTrue(cfg.cluster.mem_limit)
+        assert cfg.cluster.mem_limit
         expected_mem_limit = f'{get_machine_properties(cfg.cluster.machine_type).memory - SYSTEM_MEMORY_RESERVE}Gi'
-        self.assertEqual(cfg.cluster.mem_limit, expected_mem_limit)
-
-        self.assertTrue(cfg.timeouts.init_pv > 0)
-        self.assertTrue(cfg.timeouts.blast_k8s > 0)
+        assert cfg.cluster.mem_limit == expected_mem_limit
 
-        ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
+        assert cfg.timeouts.init_pv > 0
+        assert cfg.timeouts.blast_k8s > 0
 
     def test_default_outfmt(self):
         """ Test that default optional BLAST parameters has -outfmt 11 set """
         args = argparse.Namespace(cfg=os.path.join(TEST_DATA_DIR, 'minimal-cfg-file.ini'))
         self.cfg = configure(args)
         cfg = ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-        self.assertEqual(cfg.blast.options.strip(), f'-outfmt {ELB_DFLT_OUTFMT}')
+        assert cfg.blast.options.strip() == f'-outfmt {ELB_DFLT_OUTFMT}'
 
     def test_optional_blast_parameters(self):
         """ Test that optional BLAST parameters properly read from config file """
@@ -266,58 +289,56 @@ class ElbConfigLibTester(unittest.TestCase):
         # str.find is not enough here, need to make sure options are properly merged
         # with whitespace around them.
         options = cfg.blast.options.strip()
-        self.assertTrue(re.search('(^| )-outfmt 11($| )', options) != None)
-        self.assertTrue(re.search('(^| )-task blastp-fast($| )', options) != None)
+        assert re_outfmt_11.search(options) is not None
+        assert re_task_blastp_fast.search(options) is not None
 
     def test_optional_blast_parameters_from_command_line(self):
         """ Test that parameters are read correctly from command line """
         args = argparse.Namespace(cfg=os.path.join(TEST_DATA_DIR, 'optional-cfg-file.ini'), blast_opts=['-outfmt', '8'])
-        print(args)
         self.cfg = configure(args)
         cfg = ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-        self.assertTrue(re.search('(^| )-outfmt 8($| )', cfg.blast.options.strip()) != None)
+        assert re_outfmt_8.search(cfg.blast.options.strip()) is not None
         # NB - options are treated as single entity and command line overwrites them all, not merge, not overwrites selectively
-        self.assertTrue(cfg.blast.options.strip().find('-task blastp-fast') < 0)
+        assert cfg.blast.options.strip().find('-task blastp-fast') < 0
 
     def test_db_mol_type(self):
-        sp = ElbSupportedPrograms()
+        sp = SUPPORTED_PROGRAMS
         for p in ['BLASTp', 'blastx', 'PSIBLAST', 'rpsBLAST', 'rpstblastn']:
-            self.assertEqual(sp.get_db_mol_type(p), MolType.PROTEIN)
+            assert sp.get_db_mol_type(p) == MolType.PROTEIN
         for p in ['blastn', 'tBLASTn', 'TBLASTX']:
-            self.assertEqual(sp.get_db_mol_type(p), MolType.NUCLEOTIDE)
+            assert sp.get_db_mol_type(p) == MolType.NUCLEOTIDE
 
     def test_invalid_db_mol_type(self):
-        sp = ElbSupportedPrograms()
+        sp = SUPPORTED_PROGRAMS
         for p in ['psi-blast', 'dummy', 'rps-blast']:
-            with self.assertRaises(NotImplementedError):
+            with pytest.raises(NotImplementedError):
                 sp.get_db_mol_type(p)
 
     def test_query_mol_type(self):
-        sp = ElbSupportedPrograms()
+        sp = SUPPORTED_PROGRAMS
         for p in ['BLASTp', 'tblastn', 'PSIBLAST', 'rpsBLAST']:
-            self.assertEqual(sp.get_query_mol_type(p), MolType.PROTEIN)
+            assert sp.get_query_mol_type(p) == MolType.PROTEIN
         for p in ['blastn', 'BLASTx', 'TBLASTX', 'rpstblastn']:
-            self.assertEqual(sp.get_query_mol_type(p), MolType.NUCLEOTIDE)
+            assert sp.get_query_mol_type(p) == MolType.NUCLEOTIDE
 
     def test_invalid_query_mol_type(self):
-        sp = ElbSupportedPrograms()
+        sp = SUPPORTED_PROGRAMS
         for p in ['psi-blast', 'dummy', 'rps-blast']:
-            with self.assertRaises(NotImplementedError):
+            with pytest.raises(NotImplementedError):
                 sp.get_query_mol_type(p)
 
     def test_two_cloud_providers(self):
-        self.cfg.read(f"{TEST_DATA_DIR}/correct-cfg-file.ini")
+        self.cfg = _make_cfg('correct-cfg-file.ini')
         ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
         self.cfg[CFG_CLOUD_PROVIDER][CFG_CP_AWS_REGION] = 'test-region'
-        with self.assertRaises(UserReportError) as err:
+        with pytest.raises(UserReportError) as err:
             ElasticBlastConfig(self.cfg, task = ElbCommand.SUBMIT)
-        assert 'more than one cloud provider' in str(err.exception)
+        assert 'more than one cloud provider' in str(err.value)
 
 
 def test_validate_gcp_config(gke_mock):
     """Test validation of GCP id strings in config"""
-    cfg = configparser.ConfigParser()
-    cfg.read(f"{TEST_DATA_DIR}/correct-cfg-file.ini")
+    cfg = _make_cfg('correct-cfg-file.ini')
     ElasticBlastConfig(cfg, task = ElbCommand.SUBMIT)
 
     # test correct parameter values
@@ -348,8 +369,7 @@ def test_validate_gcp_config(gke_mock):
     assert [s for s in messages if s.startswith('Parameter "gcp-zone" has an invalid value')]
 
 
-@patch(target='elastic_blast.elb_config.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
-@patch(target='elastic_blast.tuner.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
+@pytest.mark.usefixtures('aws_machine_properties')
 def test_validate_aws_config(gke_mock):
     """Test validation of AWS config"""
     cfg = configparser.ConfigParser()
@@ -397,8 +417,7 @@ def test_validate_aws_config(gke_mock):
     assert [s for s in messages if s.startswith('Parameter "program" has an invalid value')]
 
 
-@patch(target='elastic_blast.elb_config.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
-@patch(target='elastic_blast.tuner.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
+@pytest.mark.usefixtures('aws_machine_properties')
 def test_validate_results_bucket_config(gke_mock):
     """Test validation of AWS config"""
     cfg = configparser.ConfigParser()
@@ -442,8 +461,7 @@ def test_validate_results_bucket_config(gke_mock):
     ElasticBlastConfig(cfg, task = ElbCommand.SUBMIT)
 
 
-@patch(target='elastic_blast.elb_config.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
-@patch(target='elastic_blast.tuner.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
+@pytest.mark.usefixtures('aws_machine_properties')
 def test_validate_queries_config(gke_mock):
     """Test validation of AWS config"""
     cfg = configparser.ConfigParser()
@@ -488,9 +506,8 @@ def test_validate_queries_config(gke_mock):
 
 
 @ pytest.fixture()
-def env_config():
-    """Set ELB_* environment variables and clean them up after a test"""
-    # setup
+def env_config(monkeypatch):
+    """Set ELB_* environment variables, monkeypatch restores them after a test"""
     env = {'ELB_GCP_PROJECT': 'expected-gcp-project',
            'ELB_GCP_REGION': 'test-gcp-region',
            'ELB_GCP_ZONE': 'expected-gcp-zone',
@@ -500,15 +517,10 @@ def env_config():
            'ELB_USE_PREEMPTIBLE': 'true',
            'ELB_BID_PERCENTAGE': '91'}
 
-    for var_name in env:
-        os.environ[var_name] = str(env[var_name])
-
-    yield env
+    for var_name, value in env.items():
+        monkeypatch.setenv(var_name, value)
 
-    # cleanup
-    for var_name in env:
-        # os.unsetenv does not work on every system
-        del os.environ[var_name]
+    return env
 
 
 def test_load_config_from_environment(env_config):
@@ -539,8 +551,7 @@ def check_common_defaults(cfg):
     assert cfg.blast.db_mem_margin == constants.ELB_BLASTDB_MEMORY_MARGIN
 
 
-@patch(target='elastic_blast.tuner.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
-@patch(target='elastic_blast.elb_config.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
+@pytest.mark.usefixtures('aws_machine_properties')
 def test_aws_defaults(gke_mock):
     """Test that default config parameters are set correctly for AWS"""
     args = argparse.Namespace(cfg=os.path.join(TEST_DATA_DIR, 'aws-defaults.ini'))
@@ -565,24 +576,20 @@ def test_gcp_defaults(gke_mock):
 
 
 TEST_RESULTS_BUCKET = 'gs://elasticblast-test'
+# Cluster name suffix generated from the results bucket
+TEST_RESULTS_DIGEST = hashlib.md5(TEST_RESULTS_BUCKET.encode()).hexdigest()[0:9]
 @ pytest.fixture()
-def env_config_no_cluster():
-    """Set ELB_* environment variables and clean them up after a test"""
-    # setup
+def env_config_no_cluster(monkeypatch):
+    """Set ELB_* environment variables, monkeypatch restores them after a test"""
     env = {'ELB_GCP_PROJECT': 'expected-gcp-project',
            'ELB_RESULTS': 'gs://expected-results'}
 
-    for var_name in env:
-        os.environ[var_name] = env[var_name]
+    for var_name, value in env.items():
+        monkeypatch.setenv(var_name, value)
     # Test that the results parameter is passed correctly and that trailing slash is discarded
-    os.environ['ELB_RESULTS'] = TEST_RESULTS_BUCKET + '/'
-
-    yield env
+    monkeypatch.setenv('ELB_RESULTS', TEST_RESULTS_BUCKET + '/')
 
-    # cleanup
-    for var_name in env:
-        # os.unsetenv does not work on every system
-        del os.environ[var_name]
+    return env
 
 
 def test_cluster_name_from_environment(env_config, gke_mock):
@@ -601,12 +608,10 @@ def test_generated_cluster_name(env_config_no_cluster, gke_mock):
 
     assert cfg.cluster.results == TEST_RESULTS_BUCKET
     user = getpass.getuser()
-    digest = hashlib.md5(TEST_RESULTS_BUCKET.encode()).hexdigest()[0:9]
-    assert cfg.cluster.name == f'elasticblast-{user.lower()}-{digest}'
+    assert cfg.cluster.name == f'elasticblast-{user.lower()}-{TEST_RESULTS_DIGEST}'
 
 
-@patch(target='elastic_blast.tuner.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
-@patch(target='elastic_blast.elb_config.aws_get_machine_properties', new=MagicMock(return_value=InstanceProperties(32, 120)))
+@pytest.mark.usefixtures('aws_machine_properties')
 def test_multiple_query_files(gke_mock):
     """Test getting config with multiple query files"""
     args = argparse.Namespace(cfg=os.path.join(TEST_DATA_DIR, 'multiple-query-files.ini'))
@@ -622,7 +627,7 @@ def test_mem_limit_too_high(gke_mock):
     with pytest.raises(UserReportError) as err:
         cfg = ElasticBlastConfig(configure(args), task = ElbCommand.SUBMIT)
     assert err.value.returncode == INPUT_ERROR
-    m = re.match(r'Memory limit.*exceeds', err.value.message)
+    m = re_mem_limit_exceeds.match(err.value.message)
     assert m is not None
     
 
@@ -635,7 +640,6 @@ def test_instance_too_small_aws(gke_mock):
         cfg = ElasticBlastConfig(configure(args), task = ElbCommand.SUBMIT)
         cfg.validate()
     assert err.value.returncode == INPUT_ERROR
-    print(err.value.message)
     assert 'does not have enough memory' in err.value.message
     
 def test_instance_too_small_gcp(gke_mock):
@@ -645,5 +649,4 @@ def test_instance_too_small_gcp(gke_mock):
         cfg = ElasticBlastConfig(configure(args), task = ElbCommand.SUBMIT)
         cfg.validate()
     assert err.value.returncode == INPUT_ERROR
-    print(err.value.message)
     assert 'does not have enough memory' in err.value.message
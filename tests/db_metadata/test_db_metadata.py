@@ -27,123 +27,81 @@ Created: Mon 27 Sep 2021 05:26:12 PM EDT
 
 import json
 import os
+from types import MappingProxyType
 from unittest.mock import MagicMock, patch
 from elastic_blast.db_metadata import get_db_metadata
 from elastic_blast.util import UserReportError
 from elastic_blast.constants import MolType, BLASTDB_ERROR
 from elastic_blast.base import DBSource
 from tests.utils import gke_mock, aws_credentials, DB_METADATA_PROT as DB_METADATA
+from tests.utils import DB_METADATA_V12, DB_METADATA_V12_NAME
 import pytest
 
 GCP_PRJ = "mocked-gcp-project"
 
-def test_get_db_metadata(gke_mock):
-    """Test downloading and parsing BLAST database metadata"""
-    REF_METADATA = json.loads(DB_METADATA)
+# Database source, bucket for user databases, and additional arguments for
+# get_db_metadata
+DB_SOURCES = pytest.mark.parametrize('source, bucket, kwargs',
+                                     [(DBSource.GCP, 'gs://test-bucket', {'gcp_prj': GCP_PRJ}),
+                                      (DBSource.AWS, 's3://test-bucket', {})],
+                                     ids=['GCP', 'AWS'])
 
-    # for GCP
-    db = get_db_metadata('testdb', MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
-    assert db.dbtype == REF_METADATA['dbtype']
-    assert db.bytes_to_cache == REF_METADATA['bytes-to-cache']
+# Parsed reference metadata is shared by tests, hence read-only
+REF_METADATA = MappingProxyType(json.loads(DB_METADATA))
 
-    # for AWS
-    db = get_db_metadata('testdb', MolType.PROTEIN, DBSource.AWS)
+@DB_SOURCES
+def test_get_db_metadata(gke_mock, source, bucket, kwargs):
+    """Test downloading and parsing BLAST database metadata"""
+    db = get_db_metadata('testdb', MolType.PROTEIN, source, **kwargs)
     assert db.dbtype == REF_METADATA['dbtype']
     assert db.bytes_to_cache == REF_METADATA['bytes-to-cache']
 
 
-def test_get_db_metadata_user_db(gke_mock):
+@DB_SOURCES
+def test_get_db_metadata_user_db(gke_mock, source, bucket, kwargs):
     """Test downloading and parsing BLAST database metadata for a user database"""
-    REF_METADATA = json.loads(DB_METADATA)
-
-    # for GCP
-    db = get_db_metadata('gs://test-bucket/testdb', MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
-    assert db.dbtype == REF_METADATA['dbtype']
-    assert db.bytes_to_cache == REF_METADATA['bytes-to-cache']
-
-    # for AWS
-    db = get_db_metadata('s3://test-bucket/testdb', MolType.PROTEIN, DBSource.AWS)
+    db = get_db_metadata(f'{bucket}/testdb', MolType.PROTEIN, source, **kwargs)
     assert db.dbtype == REF_METADATA['dbtype']
     assert db.bytes_to_cache == REF_METADATA['bytes-to-cache']
 
 
-DB_METADATA_VERSION_12 = """{
-  "version": "1.2",
-  "dbname": "testdb",
-  "dbtype": "Nucleotide",
-  "db-version": 5,
-  "description": "Some database",
-  "number-of-letters": 2592,
-  "number-of-sequences": 1,
-  "last-updated": "2021-12-28T13:34:00",
-  "number-of-volumes": 1,
-  "bytes-total": 37772,
-  "bytes-to-cache": 754,
-  "files": [
-    "testdb.ndb",
-    "testdb.nhr",
-    "testdb.nin",
-    "testdb.not",
-    "testdb.nsq",
-    "testdb.ntf",
-    "testdb.nto"
-  ]
-}
-"""
+REF_METADATA_VERSION_12 = MappingProxyType(json.loads(DB_METADATA_V12))
 
-def test_get_db_metadata_version_12(gke_mock):
-    """Test downloading and parsing BLAST database metadata file version 1.2"""
-    DB_NAME = 'testdb'
-    gke_mock.cloud.storage[f'gs://blast-db/000/{DB_NAME}.njs'] = DB_METADATA_VERSION_12
-    gke_mock.cloud.storage[f's3://ncbi-blast-databases/000/{DB_NAME}.njs'] = DB_METADATA_VERSION_12
-
-    REF_METADATA = json.loads(DB_METADATA_VERSION_12)
-
-    # for GCP
-    db = get_db_metadata('testdb', MolType.NUCLEOTIDE, DBSource.GCP, gcp_prj=GCP_PRJ)
-    assert db.dbtype == REF_METADATA['dbtype']
-    assert db.bytes_to_cache == REF_METADATA['bytes-to-cache']
-    assert db.version == '1.2'
-
-    # for AWS
-    db = get_db_metadata('testdb', MolType.NUCLEOTIDE, DBSource.AWS)
-    assert db.dbtype == REF_METADATA['dbtype']
-    assert db.bytes_to_cache == REF_METADATA['bytes-to-cache']
+@DB_SOURCES
+def test_get_db_metadata_version_12(gke_mock, source, bucket, kwargs):
+    """Test downloading and parsing BLAST database metadata file version 1.2,
+    which takes precedence over version 1.1 metadata for the same database"""
+    db = get_db_metadata(DB_METADATA_V12_NAME, MolType.NUCLEOTIDE, source, **kwargs)
+    assert db.dbtype == REF_METADATA_VERSION_12['dbtype']
+    assert db.bytes_to_cache == REF_METADATA_VERSION_12['bytes-to-cache']
     assert db.version == '1.2'
 
 
-def test_get_db_metadata_user_db_version_12(gke_mock):
+@DB_SOURCES
+def test_get_db_metadata_user_db_version_12(gke_mock, source, bucket, kwargs):
     """Test downloading and parsing BLAST database metadata file version 1.2 for
-    a user database"""
-    DB_NAME = 'some-db'
-    gke_mock.cloud.storage[f'gs://test-bucket/{DB_NAME}.njs'] = DB_METADATA_VERSION_12
-    gke_mock.cloud.storage[f's3://test-bucket/{DB_NAME}.njs'] = DB_METADATA_VERSION_12
-
-    REF_METADATA = json.loads(DB_METADATA_VERSION_12)
-
-    # for GCP
-    db = get_db_metadata(f'gs://test-bucket/{DB_NAME}', MolType.NUCLEOTIDE, DBSource.GCP, gcp_prj=GCP_PRJ)
-    assert db.dbtype == REF_METADATA['dbtype']
-    assert db.bytes_to_cache == REF_METADATA['bytes-to-cache']
-    assert db.version == '1.2'
-
-    # for AWS
-    db = get_db_metadata(f's3://test-bucket/{DB_NAME}', MolType.NUCLEOTIDE, DBSource.AWS)
-    assert db.dbtype == REF_METADATA['dbtype']
-    assert db.bytes_to_cache == REF_METADATA['bytes-to-cache']
+    a user database, which takes precedence over version 1.1 metadata"""
+    db = get_db_metadata(f'{bucket}/{DB_METADATA_V12_NAME}', MolType.NUCLEOTIDE, source, **kwargs)
+    assert db.dbtype == REF_METADATA_VERSION_12['dbtype']
+    assert db.bytes_to_cache == REF_METADATA_VERSION_12['bytes-to-cache']
     assert db.version == '1.2'
 
 
-def test_missing_metadata_file(gke_mock):
+@DB_SOURCES
+def test_missing_metadata_file(gke_mock, source, bucket, kwargs):
     """Test that the correct exception is raised when the metadata file is
     missing"""
     with pytest.raises(FileNotFoundError):
-        get_db_metadata('s3://some-bucket/non-existent-db', MolType.NUCLEOTIDE, DBSource.AWS)
+        get_db_metadata(f'{bucket}/non-existent-db', MolType.NUCLEOTIDE, source, **kwargs)
 
     with pytest.raises(FileNotFoundError):
-        get_db_metadata('this-db-does-not-exist', MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
+        get_db_metadata('this-db-does-not-exist', MolType.PROTEIN, source, **kwargs)
 
 
+# User database and its metadata file used in tests of metadata content
+USER_DB = 'gs://bucket/somedb'
+USER_DB_METADATA_FILE = f'{USER_DB}-prot-metadata.json'
+
 # additional field at the end
 DB_METADATA_NEW_FIELD = """{
   "dbname": "swissprot",
@@ -172,16 +130,15 @@ DB_METADATA_NEW_FIELD = """{
   "new-field": "some-value"
 }
 """
+REF_METADATA_NEW_FIELD = MappingProxyType(json.loads(DB_METADATA_NEW_FIELD))
 
 def test_metadata_with_new_field(gke_mock):
     """Test that additional field in the metadata file does not cause problems"""
-    DB = 'gs://bucket/somedb'
-    REF_METADATA = json.loads(DB_METADATA_NEW_FIELD)
-    gke_mock.cloud.storage[f'{DB}-prot-metadata.json'] = DB_METADATA_NEW_FIELD
+    gke_mock.cloud.storage[USER_DB_METADATA_FILE] = DB_METADATA_NEW_FIELD
 
-    db = get_db_metadata(DB, MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
-    assert db.dbtype == REF_METADATA['dbtype']
-    assert db.bytes_to_cache == REF_METADATA['bytes-to-cache']
+    db = get_db_metadata(USER_DB, MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
+    assert db.dbtype == REF_METADATA_NEW_FIELD['dbtype']
+    assert db.bytes_to_cache == REF_METADATA_NEW_FIELD['bytes-to-cache']
 
 
 # last-updated is missing
@@ -213,11 +170,10 @@ DB_METADATA_MISSING_FIELD = """{
 
 def test_missing_field(gke_mock):
     """Test that a missing field in metadata is properly reported"""
-    DB = 'gs://bucket/somedb'
-    gke_mock.cloud.storage[f'{DB}-prot-metadata.json'] = DB_METADATA_MISSING_FIELD
+    gke_mock.cloud.storage[USER_DB_METADATA_FILE] = DB_METADATA_MISSING_FIELD
 
     with pytest.raises(UserReportError) as err:
-        db = get_db_metadata(DB, MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
+        db = get_db_metadata(USER_DB, MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
     assert err.value.returncode == BLASTDB_ERROR
     # last-updated is the missing field
     assert 'last-updated' in err.value.message
@@ -254,21 +210,19 @@ DB_METADATA_SPEC_PROBLEM = """{
 
 def test_spec_problem(gke_mock):
     """Test that a missing field in metadata is properly reported"""
-    DB = 'gs://bucket/somedb'
-    gke_mock.cloud.storage[f'{DB}-prot-metadata.json'] = DB_METADATA_SPEC_PROBLEM
+    gke_mock.cloud.storage[USER_DB_METADATA_FILE] = DB_METADATA_SPEC_PROBLEM
 
     with pytest.raises(UserReportError) as err:
-        db = get_db_metadata(DB, MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
+        db = get_db_metadata(USER_DB, MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
     assert err.value.returncode == BLASTDB_ERROR
     assert 'Problem parsing BLAST database metadata file' in err.value.message
 
 
 def test_malformed_json(gke_mock):
     """Test that malformed metadata file is properly reported"""
-    DB = 'gs://bucket/somedb'
-    gke_mock.cloud.storage[f'{DB}-prot-metadata.json'] = 'abc'
+    gke_mock.cloud.storage[USER_DB_METADATA_FILE] = 'abc'
 
     with pytest.raises(UserReportError) as err:
-        db = get_db_metadata(DB, MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
+        db = get_db_metadata(USER_DB, MolType.PROTEIN, DBSource.GCP, gcp_prj=GCP_PRJ)
     assert err.value.returncode == BLASTDB_ERROR
     assert 'is not a proper JSON file' in err.value.message
@@ -56,6 +56,7 @@ def bucket_object_name_to_delete(obj_name: str):
         delete_from_s3(obj_name)
 
 
+@pytest.mark.serial
 @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
 def test_write_to_s3():
     text_to_write = 'hello world from ElasticBLAST'
@@ -70,6 +71,7 @@ def test_write_to_s3():
             assert text_to_write == text_from_bucket
 
 
+@pytest.mark.serial
 @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
 def test_check_aws_for_read_success():
     fn = READABLE_S3_FILE
@@ -96,6 +98,7 @@ def test_check_aws_for_read_success():
             pass
 
 
+@pytest.mark.serial
 @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
 def test_check_aws_for_write_success():
     for prefix in ['', PREFIX]:
@@ -111,6 +114,7 @@ def test_check_aws_for_write_success():
             assert test_text == 'Test'
     
 
+@pytest.mark.serial
 @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
 def test_check_aws_for_write_failure():
     tn = os.path.join(WRONG_BUCKET, mktemp(prefix='', dir=''))
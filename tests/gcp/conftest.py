@@ -0,0 +1,83 @@
+#                           PUBLIC DOMAIN NOTICE
+#              National Center for Biotechnology Information
+#  
+# This software is a "United States Government Work" under the
+# terms of the United States Copyright Act.  It was written as part of
+# the authors' official duties as United States Government employees and
+# thus cannot be copyrighted.  This software is freely available
+# to the public for use.  The National Library of Medicine and the U.S.
+# Government have not placed any restriction on its use or reproduction.
+#   
+# Although all reasonable efforts have been taken to ensure the accuracy
+# and reliability of the software and data, the NLM and the U.S.
+# Government do not and cannot warrant the performance or results that
+# may be obtained by using this software or data.  The NLM and the U.S.
+# Government disclaim all warranties, express or implied, including
+# warranties of performance, merchantability or fitness for any particular
+# purpose.
+#   
+# Please cite NCBI in any work or product based on this material.
+
+
+"""
+tests/gcp/conftest.py - pytest fixtures for GCP tests
+
+"""
+
+import copy
+import os
+from unittest.mock import patch, MagicMock
+from elastic_blast.constants import ElbCommand
+from elastic_blast.elb_config import ElasticBlastConfig
+from tests.utils import get_mocked_config, patched_safe_exec, db_metadata
+from tests.utils import GKEMock, GCP_REGIONS
+import pytest
+
+
+# Tests that run real gcloud require specific GCP credentials and may create
+# GCP resources. Set environment variable RUN_ALL_TESTS to run them.
+collect_ignore = []
+if not os.getenv('RUN_ALL_TESTS'):
+    collect_ignore.append('test_gcp_real.py')
+
+
+@pytest.fixture(scope='session')
+def base_cfg():
+    """Config for mocked gcloud and kubectl created once per test session
+    (once per worker when tests are run in parallel with pytest-xdist).
+    Tests should use the cfg fixture, which provides a copy that can be
+    modified."""
+    with patch(target='elastic_blast.elb_config.gcp_get_regions', new=MagicMock(return_value=GCP_REGIONS)), \
+         patch(target='elastic_blast.elb_config.get_db_metadata', new=MagicMock(return_value=db_metadata())), \
+         patched_safe_exec(GKEMock().mocked_safe_exec):
+        cfg = get_mocked_config()
+    return cfg
+
+
+@pytest.fixture
+def cfg(base_cfg):
+    """A copy of config for mocked gcloud and kubectl"""
+    return copy.deepcopy(base_cfg)
+
+
+@pytest.fixture(scope='session')
+def base_delete_cfg():
+    """Config for the delete command with mocked gcloud created once per test
+    session. Tests should use the delete_cfg fixture."""
+    with patch(target='elastic_blast.elb_config.gcp_get_regions', new=MagicMock(return_value=GCP_REGIONS)), \
+         patched_safe_exec(GKEMock().mocked_safe_exec,
+                           modules=('elastic_blast.elb_config',
+                                    'elastic_blast.util',
+                                    'elastic_blast.gcp_traits')):
+        cfg = ElasticBlastConfig(gcp_project = 'test-gcp-project',
+                                 gcp_region = 'test-gcp-region',
+                                 gcp_zone = 'test-gcp-zone',
+                                 results = 'gs://test-bucket',
+                                 task = ElbCommand.DELETE)
+    return cfg
+
+
+@pytest.fixture
+def delete_cfg(base_delete_cfg):
+    """A copy of config for the delete command with mocked gcloud"""
+    return copy.deepcopy(base_delete_cfg)
@@ -0,0 +1,116 @@
+#                           PUBLIC DOMAIN NOTICE
+#              National Center for Biotechnology Information
+#  
+# This software is a "United States Government Work" under the
+# terms of the United States Copyright Act.  It was written as part of
+# the authors' official duties as United States Government employees and
+# thus cannot be copyrighted.  This software is freely available
+# to the public for use.  The National Library of Medicine and the U.S.
+# Government have not placed any restriction on its use or reproduction.
+#   
+# Although all reasonable efforts have been taken to ensure the accuracy
+# and reliability of the software and data, the NLM and the U.S.
+# Government do not and cannot warrant the performance or results that
+# may be obtained by using this software or data.  The NLM and the U.S.
+# Government disclaim all warranties, express or implied, including
+# warranties of performance, merchantability or fitness for any particular
+# purpose.
+#   
+# Please cite NCBI in any work or product based on this material.
+
+"""
+Tests for gcp module that run real gcloud. These tests require specific GCP
+credentials and may create GCP resources. They are collected only when
+environment variable RUN_ALL_TESTS is set.
+
+"""
+
+import os
+from argparse import Namespace
+import pytest  # type: ignore
+from elastic_blast import gcp
+from elastic_blast import config
+from elastic_blast import elb_config
+from elastic_blast.constants import ElbCommand
+from elastic_blast.util import SafeExecError
+from elastic_blast.elb_config import ElasticBlastConfig
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+pytestmark = pytest.mark.serial
+
+
+def test_get_gcp_project_real():
+    """Test getting GCP project using real command line"""
+    result = elb_config.get_gcp_project()
+    # result must not be an empty string
+    assert (result is None or len(result) > 0)
+
+
+@pytest.fixture
+def provide_disk():
+    """Fixture function that creates GCP disk when setting up a test and
+    deletes it when tearing the test down, returns disk name."""
+
+    # test setup
+    name = os.environ['USER'] + '-elastic-blast-test-suite'
+    args = Namespace(cfg=os.path.join(TEST_DATA_DIR, 'test-cfg-file.ini'))
+    cfg = ElasticBlastConfig(config.configure(args), task = ElbCommand.SUBMIT)
+    cmd = f'gcloud beta compute disks create {name} --project={cfg.gcp.project} --type=pd-standard --size=10GB --zone={cfg.gcp.zone}'
+    gcp.safe_exec(cmd.split())
+    yield name, cfg
+
+    # test teardown
+    if name in gcp.get_disks(cfg):
+        gcp.delete_disk(name, cfg)
+
+
+def test_get_delete_disk_real(provide_disk):
+    """Test deleting GCP disk using real gcloud calls"""
+
+    # disk name
+    name, cfg = provide_disk
+
+    # the disk was created in setp
+    assert name in gcp.get_disks(cfg)
+
+    # delete the disk and test that it does not appear when listing disks
+    gcp.delete_disk(name, cfg)
+    assert name not in gcp.get_disks(cfg)
+
+
+@pytest.fixture
+def provide_cluster():
+    """Create a GCKE cluster before and delete it after a test"""
+    # setup
+    args = Namespace(cfg=os.path.join(TEST_DATA_DIR, 'test-cfg-file.ini'))
+    cfg = ElasticBlastConfig(config.configure(args), task = ElbCommand.SUBMIT)
+    cfg.cluster.name = cfg.cluster.name + f'-{os.environ["USER"]}'
+
+    cmd = f'gcloud container clusters create {cfg.cluster.name} --num-nodes 1 --machine-type n1-standard-1 --labels elb=test-suite'
+    gcp.safe_exec(cmd.split())
+    yield cfg
+
+    # teardown
+    name = cfg.cluster.name
+    if name in gcp.get_gke_clusters(cfg):
+        cmd = f'gcloud container clusters delete {name} -q'
+        gcp.safe_exec(cmd.split())
+
+
+def test_get_gke_credentials_real(provide_cluster):
+    """Test that gcp.get_gke_credentials does not raise exceptiions when a
+    cluster is present"""
+    cfg = provide_cluster
+    gcp.get_gke_credentials(cfg)
+
+
+def test_get_gke_credentials_no_cluster_real():
+    """Test that util.SafeExecError is raised when getting credentials of a
+    non-existent cluster"""
+    args = Namespace(cfg=os.path.join(TEST_DATA_DIR, 'test-cfg-file.ini'))
+    cfg = ElasticBlastConfig(config.configure(args), task = ElbCommand.SUBMIT)
+    cfg.cluster.name = 'some-strange-cluster-name'
+    assert cfg.cluster.name not in gcp.get_gke_clusters(cfg)
+    with pytest.raises(SafeExecError):
+        gcp.get_gke_credentials(cfg)
@@ -353,6 +353,7 @@ def gke_cluster_with_pv():
     assert not errors, message
 
 
+@pytest.mark.serial
 @pytest.mark.skipif(SKIP, reason='This test requires specific GCP credentials and may create GCP resources. It should be used with care.')
 def test_get_persistent_disks_real(gke_cluster_with_pv):
     """Test listing GKE persistent disks using real kubectl"""
@@ -372,6 +373,7 @@ def test_get_persistent_disks_real(gke_cluster_with_pv):
     assert len([d for d in gcp.get_disks() if disks[0] in d]) == 1
 
 
+@pytest.mark.serial
 @pytest.mark.skipif(SKIP, reason='This test requires specific GCP credentials and may create GCP resources. It should be used with care.')
 def test_delete_all_real(gke_cluster_with_pv):
     """Test deleting all jobs, pvcs, and pvs on a real GKE cluster"""
@@ -79,6 +79,7 @@ class TestResourceQuotasAws(unittest.TestCase):
                 with patch(target='boto3.client', new=MagicMock(side_effect=GKEMock().mocked_client)):
                     self.cfg_aws = ElasticBlastConfig(cfg_aws, task = ElbCommand.SUBMIT)
 
+    @pytest.mark.serial
     @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
     def test_check_resource_quotas_aws(self):
         self.assertEqual(self.cfg_aws.aws.cloud, CSP.AWS)
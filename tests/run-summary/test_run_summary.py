@@ -38,6 +38,7 @@ TEST_CASES = [
     (TEST_FAILED_LOGS, TEST_FAILED_SUMMARY)
 ]
 
+@pytest.mark.serial
 @pytest.mark.skipif(os.getenv('TEAMCITY_VERSION') is not None, reason='AWS credentials not set in TC')
 def test_from_logs():
     for logs, summary in TEST_CASES:
@@ -167,6 +167,7 @@ def blastdb_not_found_fixture():
     gcp.delete_cluster_with_cleanup(cfg)
 
 
+@pytest.mark.serial
 @pytest.mark.skipif(SKIP, reason='This test requires specific GCP credentials and may create GCP resources. It should be used with care.')
 def test_blastdb_not_found_real(blastdb_not_found_fixture):
     """Test that UserReportError is raised when database is not found"""
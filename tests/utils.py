@@ -35,15 +35,18 @@ Created: Wed 29 Apr 2020 06:50:51 PM EDT
 import json
 import os
 import io
-from dataclasses import dataclass, field
+from contextlib import contextmanager, ExitStack
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
 from unittest.mock import MagicMock, patch
 from botocore.exceptions import ClientError
 from elastic_blast.util import SafeExecError
-from elastic_blast import config
+from elastic_blast import config, aws_traits
 from elastic_blast.elb_config import ElasticBlastConfig
+from elastic_blast.db_metadata import DbMetadata
 from elastic_blast.constants import ElbCommand, ELB_DFLT_FSIZE_FOR_TESTING
 from elastic_blast.constants import ELB_DFLT_AWS_REGION, CLUSTER_ERROR
-from typing import Optional, List, Union, Dict
+from typing import Optional, List, Union, Dict, Tuple
 import pytest
 
 # name of bucket without write permissions, used for tests where bucket exits
@@ -108,6 +111,34 @@ DB_METADATA_NUCL = """{
 """
 DB_METADATA_NUCL_FILE_NAME = 'testdb-nucl-metadata.json'
 
+# BLAST database metadata in version 1.2 format
+DB_METADATA_V12 = """{
+  "version": "1.2",
+  "dbname": "testdb",
+  "dbtype": "Nucleotide",
+  "db-version": 5,
+  "description": "Some database",
+  "number-of-letters": 2592,
+  "number-of-sequences": 1,
+  "last-updated": "2021-12-28T13:34:00",
+  "number-of-volumes": 1,
+  "bytes-total": 37772,
+  "bytes-to-cache": 754,
+  "files": [
+    "testdb.ndb",
+    "testdb.nhr",
+    "testdb.nin",
+    "testdb.not",
+    "testdb.nsq",
+    "testdb.ntf",
+    "testdb.nto"
+  ]
+}
+"""
+# Database name used for version 1.2 metadata files in mocked storage, the
+# database also has version 1.1 metadata
+DB_METADATA_V12_NAME = 'testdb-v12'
+
 
 class MockedCompletedProcess:
     """Fake subprocess.CompletedProcess class used for mocking return
@@ -154,38 +185,57 @@ class MockedCompletedProcess:
         return (0, b' ')
 
 
-@pytest.fixture
-def gke_mock(mocker):
-    """Fixtire function that replaces util.safe_exec with mocked_safe_exec"""
-
-    mock = GKEMock()
+@lru_cache(maxsize=None)
+def _preset_cloud_resources() -> 'CloudResources':
+    """Cloud resources present for every test that uses gke_mock. They are
+    created once and copied into each GKEMock, so the returned object must not
+    be modified."""
+    cloud = CloudResources()
 
-    mock.cloud.conf['project'] = GCP_PROJECT
+    cloud.conf['project'] = GCP_PROJECT
 
-    mock.cloud.storage['gs://test-bucket'] = 0
-    mock.cloud.storage['gs://test-bucket/test-query.fa'] = '>query\nACTGGAGATGAC'
-    mock.cloud.storage['gs://test-results'] = ''
-    mock.cloud.storage[f'gs://{NOT_WRITABLE_BUCKET}'] = ''
-    mock.cloud.storage['s3://test-bucket/test-query.fa'] = '>query\nACTGGAGATGAC'
-    mock.cloud.storage['s3://test-bucket'] = 0
-    mock.cloud.storage['s3://test-results'] = ''
-    mock.cloud.storage[f's3://{NOT_WRITABLE_BUCKET}'] = ''
+    cloud.storage['gs://test-bucket'] = 0
+    cloud.storage['gs://test-bucket/test-query.fa'] = '>query\nACTGGAGATGAC'
+    cloud.storage['gs://test-results'] = ''
+    cloud.storage[f'gs://{NOT_WRITABLE_BUCKET}'] = ''
+    cloud.storage['s3://test-bucket/test-query.fa'] = '>query\nACTGGAGATGAC'
+    cloud.storage['s3://test-bucket'] = 0
+    cloud.storage['s3://test-results'] = ''
+    cloud.storage[f's3://{NOT_WRITABLE_BUCKET}'] = ''
 
     # Mocked NCBI database metadata
-    mock.cloud.storage['gs://blast-db/latest-dir'] = '000'
-    mock.cloud.storage[f'gs://blast-db/000/{DB_METADATA_PROT_FILE_NAME}'] = DB_METADATA_PROT
-    mock.cloud.storage[f'gs://blast-db/000/{DB_METADATA_NUCL_FILE_NAME}'] = DB_METADATA_NUCL
-    mock.cloud.storage['s3://ncbi-blast-databases/latest-dir'] = '000'
-    mock.cloud.storage[f's3://ncbi-blast-databases/000/{DB_METADATA_PROT_FILE_NAME}'] = DB_METADATA_PROT
-    mock.cloud.storage[f's3://ncbi-blast-databases/000/{DB_METADATA_NUCL_FILE_NAME}'] = DB_METADATA_NUCL
+    cloud.storage['gs://blast-db/latest-dir'] = '000'
+    cloud.storage[f'gs://blast-db/000/{DB_METADATA_PROT_FILE_NAME}'] = DB_METADATA_PROT
+    cloud.storage[f'gs://blast-db/000/{DB_METADATA_NUCL_FILE_NAME}'] = DB_METADATA_NUCL
+    cloud.storage['s3://ncbi-blast-databases/latest-dir'] = '000'
+    cloud.storage[f's3://ncbi-blast-databases/000/{DB_METADATA_PROT_FILE_NAME}'] = DB_METADATA_PROT
+    cloud.storage[f's3://ncbi-blast-databases/000/{DB_METADATA_NUCL_FILE_NAME}'] = DB_METADATA_NUCL
 
     # User database metadata
-    mock.cloud.storage[f'gs://test-bucket/{DB_METADATA_PROT_FILE_NAME}'] = DB_METADATA_PROT
-    mock.cloud.storage[f'gs://test-bucket/{DB_METADATA_NUCL_FILE_NAME}'] = DB_METADATA_NUCL
-    mock.cloud.storage['gs://test-bucket/testdb.pal'] = 'A fake user database'
-    mock.cloud.storage[f's3://test-bucket/{DB_METADATA_PROT_FILE_NAME}'] = DB_METADATA_PROT
-    mock.cloud.storage[f's3://test-bucket/{DB_METADATA_NUCL_FILE_NAME}'] = DB_METADATA_NUCL
-    mock.cloud.storage['s3://test-bucket/testdb.pal'] = 'A fake user database'
+    cloud.storage[f'gs://test-bucket/{DB_METADATA_PROT_FILE_NAME}'] = DB_METADATA_PROT
+    cloud.storage[f'gs://test-bucket/{DB_METADATA_NUCL_FILE_NAME}'] = DB_METADATA_NUCL
+    cloud.storage['gs://test-bucket/testdb.pal'] = 'A fake user database'
+    cloud.storage[f's3://test-bucket/{DB_METADATA_PROT_FILE_NAME}'] = DB_METADATA_PROT
+    cloud.storage[f's3://test-bucket/{DB_METADATA_NUCL_FILE_NAME}'] = DB_METADATA_NUCL
+    cloud.storage['s3://test-bucket/testdb.pal'] = 'A fake user database'
+
+    # Database metadata in version 1.2 format, along with version 1.1
+    # metadata for the same database, which must not be used
+    for bucket in ['gs://blast-db/000', 's3://ncbi-blast-databases/000',
+                   'gs://test-bucket', 's3://test-bucket']:
+        cloud.storage[f'{bucket}/{DB_METADATA_V12_NAME}.njs'] = DB_METADATA_V12
+        cloud.storage[f'{bucket}/{DB_METADATA_V12_NAME}-nucl-metadata.json'] = DB_METADATA_NUCL
+    return cloud
+
+
+@pytest.fixture
+def gke_mock(mocker):
+    """Fixtire function that replaces util.safe_exec with mocked_safe_exec"""
+
+    mock = GKEMock()
+    preset = _preset_cloud_resources()
+    mock.cloud = CloudResources(storage=dict(preset.storage),
+                                conf=dict(preset.conf))
 
     # we need gcp.safe_exec instead of util.safe exec here, because
     # safe_exec is imported in gcp.py with 'from util import safe_exec'
@@ -238,6 +288,46 @@ def get_mocked_config() -> ElasticBlastConfig:
     return cfg
 
 
+# Database metadata returned by db_metadata, must not be modified
+_DB_METADATA = DbMetadata(version = '1',
+                          dbname = 'some-name',
+                          dbtype = 'Protein',
+                          description = 'A test database',
+                          number_of_letters = 25,
+                          number_of_sequences = 25,
+                          files = [],
+                          last_updated = 'some-date',
+                          bytes_total = 25,
+                          bytes_to_cache = 25,
+                          number_of_volumes = 1)
+
+
+def db_metadata(**changes) -> DbMetadata:
+    """Return a new copy of database metadata for mocking
+    elb_config.get_db_metadata, so that a test cannot change it for other
+    tests. Keyword arguments replace values of DbMetadata fields."""
+    changes.setdefault('files', list(_DB_METADATA.files))
+    return replace(_DB_METADATA, **changes)
+
+
+@contextmanager
+def patched_safe_exec(side_effect, modules: Tuple[str, ...] = ('elastic_blast.elb_config', 'elastic_blast.util')):
+    """Context manager that replaces safe_exec in several elastic_blast
+    modules with a single mock
+
+    Arguments:
+        side_effect: Function called instead of safe_exec
+        modules: Modules where safe_exec is replaced
+
+    Yields:
+        The mock object"""
+    mock = MagicMock(side_effect=side_effect)
+    with ExitStack() as stack:
+        for module in modules:
+            stack.enter_context(patch(target=f'{module}.safe_exec', new=mock))
+        yield mock
+
+
 @dataclass
 class CloudResources:
     """Class to simulate created cloud resources"""
@@ -599,6 +689,16 @@ def aws_credentials():
         os.environ[i] = saved_vars[i]
 
 
+@pytest.fixture(autouse=True)
+def clear_aws_traits_cache():
+    """AWS API results cached in elastic_blast.aws_traits depend on how boto3
+    is mocked in a test, so they must not be shared between tests. The
+    fixture is autouse when imported into a conftest.py."""
+    yield
+    aws_traits._get_regions.cache_clear()
+    aws_traits._get_machine_properties.cache_clear()
+
+
 class MockedS3Object:
     """Mocked boto3 S3 object"""
     def __init__(self, bucket, key):